@@ -0,0 +1,566 @@
+"""Lokaler Ersatz für die weconnect-Bibliothek (nur für Benchmarks).
+
+Bildet die Teile der weconnect-API nach, die die Integration nutzt
+(WeConnect, Vehicle, pictures, Domain, Statusklassen, Badges, Bildliste
+und Bildebenen für die lokale Komposition, Fehlerklassen), mit
+einstellbarer Latenz, Flottengröße und Bildgröße. install() registriert
+die Module in sys.modules, bevor die Integration sie importiert.
+"""
+
+from __future__ import annotations
+
+import atexit
+import enum
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import types
+from dataclasses import dataclass
+
+from PIL import Image
+
+PICTURE_KEYS = ("car", "carWithBadge", "status", "statusWithBadge")
+
+# Bildliste wie https://emea.bff.cariad.digital/media/v2/vehicle-images/{vin}
+MEDIA_PREFIX = "https://emea.bff.cariad.digital/media/v2/vehicle-images/"
+LAYER_URL = "https://fake-media.invalid/{vin}/{layer}.png"
+DOORS = ("frontLeft", "frontRight", "rearLeft", "rearRight")
+LIGHTS = ("left", "right")
+
+
+@dataclass
+class BackendConfig:
+    """Einstellungen des simulierten Backends."""
+
+    fleet_size: int = 1
+    image_width: int = 1024
+    image_height: int = 576
+    login_latency: float = 0.5
+    update_latency: float = 0.3
+    vehicle_latency: float = 0.05
+    # Latenz je heruntergeladener Bildebene
+    layer_latency: float = 0.01
+    # Zusätzliche Latenz je abgefragter Domain (selectivestatus-Jobs)
+    domain_latency: float = 0.005
+    # Anteil der dynamischen Bilder, die sich pro Update ändern
+    change_ratio: float = 0.25
+    # Anteil der Abrufe, die mit RetrievalError scheitern (Ausfall-Simulation)
+    failure_rate: float = 0.0
+    # Anzahl vorberechneter Bildvarianten (begrenzt den Speicherbedarf)
+    image_variants: int = 8
+    seed: int = 1
+
+
+CONFIG = BackendConfig()
+_IMAGES: list[Image.Image] = []
+# PNG-Bytes je Bildebene (Basisansichten je Bildvariante)
+_LAYER_PNGS: dict[tuple[str, int], bytes] = {}
+# Zähler für Aufrufe gegen das simulierte Backend
+CALLS: dict[str, int] = {
+    "login": 0,
+    "update": 0,
+    "vehicle_update": 0,
+    "pictures": 0,
+    "status_jobs": 0,
+    "capabilities": 0,
+    "fetch": 0,
+    "layer_downloads": 0,
+    "failed": 0,
+}
+_FAILURES = random.Random(0)
+
+
+class Domain(enum.Enum):
+    """Teilmenge von weconnect.domain.Domain."""
+
+    ALL = "all"
+    ALL_CAPABLE = "allCapable"
+    ACCESS = "access"
+    USER_CAPABILITIES = "userCapabilities"
+    CHARGING = "charging"
+    CLIMATISATION = "climatisation"
+    VEHICLE_LIGHTS = "vehicleLights"
+    READINESS = "readiness"
+    VEHICLE_HEALTH_WARNINGS = "vehicleHealthWarnings"
+    MEASUREMENTS = "measurements"
+    FUEL_STATUS = "fuelStatus"
+    PARKING = "parking"
+    TRIPS = "trips"
+
+    def __str__(self):
+        return self.value
+
+
+class RetrievalError(Exception):
+    pass
+
+
+class TooManyRequestsError(RetrievalError):
+    pass
+
+
+class AuthentificationError(Exception):
+    pass
+
+
+class TemporaryAuthentificationError(AuthentificationError):
+    pass
+
+
+class APICompatibilityError(Exception):
+    pass
+
+
+class AccessStatus:
+    """Teilmenge von weconnect.elements.access_status.AccessStatus."""
+
+    class OverallState(enum.Enum):
+        SAFE = "safe"
+        UNSAFE = "unsafe"
+        INVALID = "invalid"
+        UNKNOWN = "unknown"
+
+    class Door:
+        class OpenState(enum.Enum):
+            OPEN = "open"
+            CLOSED = "closed"
+            UNSUPPORTED = "unsupported"
+            INVALID = "invalid"
+            UNKNOWN = "unknown"
+
+    class Window:
+        class OpenState(enum.Enum):
+            OPEN = "open"
+            CLOSED = "closed"
+            UNSUPPORTED = "unsupported"
+            INVALID = "invalid"
+            UNKNOWN = "unknown"
+
+
+class ChargingStatus:
+    """Teilmenge von weconnect.elements.charging_status.ChargingStatus."""
+
+    class ChargingState(enum.Enum):
+        OFF = "off"
+        READY_FOR_CHARGING = "readyForCharging"
+        CHARGING = "charging"
+        CONSERVATION = "conservation"
+        CHARGE_PURPOSE_REACHED_CONSERVATION = "chargePurposeReachedAndConservation"
+        ERROR = "error"
+
+
+class ClimatizationStatus:
+    """Teilmenge von weconnect.elements.climatization_status."""
+
+    class ClimatizationState(enum.Enum):
+        OFF = "off"
+        HEATING = "heating"
+        COOLING = "cooling"
+        VENTILATION = "ventilation"
+
+
+class LightsStatus:
+    """Teilmenge von weconnect.elements.lights_status.LightsStatus."""
+
+    class Light:
+        class LightState(enum.Enum):
+            ON = "on"
+            OFF = "off"
+
+
+class PlugStatus:
+    """Teilmenge von weconnect.elements.plug_status.PlugStatus."""
+
+    class PlugConnectionState(enum.Enum):
+        CONNECTED = "connected"
+        DISCONNECTED = "disconnected"
+
+
+class _Attribute:
+    """Minimaler AddressableAttribute-Ersatz (value, enabled)."""
+
+    def __init__(self, value) -> None:
+        self.value = value
+        self.enabled = value is not None
+
+
+def _make_image(index: int) -> Image.Image:
+    """Teilweise komprimierbares RGBA-Testbild erzeugen."""
+    size = (CONFIG.image_width, CONFIG.image_height)
+    gradient = Image.linear_gradient("L").resize(size)
+    channels = []
+    for channel in range(3):
+        noise = Image.effect_noise(size, 10 + index * 3 + channel)
+        channels.append(Image.blend(gradient, noise, 0.3))
+    alpha = Image.new("L", size, 255)
+    return Image.merge("RGBA", (*channels, alpha))
+
+
+def _image(index: int) -> Image.Image:
+    if not _IMAGES:
+        _IMAGES.extend(_make_image(i) for i in range(CONFIG.image_variants))
+    return _IMAGES[index % len(_IMAGES)]
+
+
+def _layer_names() -> list[str]:
+    """IDs der Bildebenen, wie sie die Bildliste von WeConnect liefert."""
+    names = ["car_34view", "car_birdview"]
+    for door in DOORS:
+        side = "left" if "Left" in door else "right"
+        row = "front" if door.startswith("front") else "back"
+        for kind in ("door", "window"):
+            names.extend((f"{kind}_{side}_{row}", f"{kind}_{side}_{row}_overlay"))
+    names.extend(f"light_{light}" for light in LIGHTS)
+    return names
+
+
+def _layer_png(layer: str, index: int) -> bytes:
+    """PNG-Bytes einer Bildebene (Basisansichten je Fahrzeugvariante)."""
+    variant = index % CONFIG.image_variants if layer.startswith("car_") else 0
+    png = _LAYER_PNGS.get((layer, variant))
+    if png is None:
+        if layer.startswith("car_"):
+            image = _image(variant)
+        else:
+            # Transparente Ebene mit einem Rechteck an fester Position
+            size = (CONFIG.image_width, CONFIG.image_height)
+            image = Image.new("RGBA", size, (0, 0, 0, 0))
+            offset = sum(map(ord, layer)) % max(1, size[0] - size[0] // 8)
+            image.paste(
+                (200, 40, 40, 180),
+                (offset, size[1] // 3, offset + size[0] // 8, size[1] // 2),
+            )
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=1)
+        png = _LAYER_PNGS[(layer, variant)] = buffer.getvalue()
+    return png
+
+
+def _write_badges(directory: str) -> None:
+    """Badge-Grafiken wie im weconnect-Paket (badges/<name>.png) anlegen."""
+    os.makedirs(directory, exist_ok=True)
+    for index, badge in enumerate(FakeVehicle.Badge):
+        image = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+        image.paste((40, 40 + index * 20, 200, 255), (10, 10, 90, 90))
+        image.save(os.path.join(directory, f"{badge.value}.png"))
+
+
+class _Response:
+    """Antwort des simulierten Medien-Servers."""
+
+    def __init__(self, status_code: int, content: bytes = b"") -> None:
+        self.status_code = status_code
+        self.content = content
+
+
+class _FakeSession:
+    """Ersatz für die OAuth-Session (Token und Download der Bildebenen)."""
+
+    def __init__(self) -> None:
+        self.token = None
+        self.authorized = False
+
+    def get(self, url: str, stream: bool = False, timeout=None) -> _Response:
+        CALLS["layer_downloads"] += 1
+        time.sleep(CONFIG.layer_latency)
+        vin, name = url.rsplit("/", 2)[-2:]
+        return _Response(200, _layer_png(name.removesuffix(".png"), int(vin[6:])))
+
+
+class FakeVehicle:
+    """Fahrzeug mit vier Bildtypen und Status für die lokale Komposition.
+
+    Dynamische Bilder bzw. Türen, Verriegelung und Ladezustand wechseln
+    zufällig (change_ratio je Update).
+    """
+
+    class Badge(enum.Enum):
+        CHARGING = "charging"
+        CONNECTED = "connected"
+        COOLING = "cooling"
+        HEATING = "heating"
+        LOCKED = "locked"
+        PARKING = "parking"
+        UNLOCKED = "unlocked"
+        VENTILATING = "ventilating"
+        WARNING = "warning"
+
+    def __init__(self, weconnect: FakeWeConnect, vin: str, index: int) -> None:
+        self.weConnect = weconnect
+        self.vin = _Attribute(vin)
+        self.model = _Attribute(f"ID.{index % 7 + 3}")
+        self.nickname = _Attribute(f"Fahrzeug {index}")
+        self.domains: dict = self._make_domains()
+        self.pictures: dict[str, _Attribute] = {}
+        self._index = index
+        self._variants = {key: index for key in PICTURE_KEYS}
+        self._random = random.Random(CONFIG.seed + index)
+
+    @staticmethod
+    def _make_domains() -> dict:
+        closed = AccessStatus.Door.OpenState.CLOSED
+        access = types.SimpleNamespace(
+            error=_Attribute(None),
+            overallStatus=_Attribute(AccessStatus.OverallState.SAFE),
+            doors={
+                door: types.SimpleNamespace(openState=_Attribute(closed))
+                for door in DOORS
+            },
+            windows={
+                door: types.SimpleNamespace(
+                    openState=_Attribute(AccessStatus.Window.OpenState.CLOSED)
+                )
+                for door in DOORS
+            },
+        )
+        lights = types.SimpleNamespace(
+            lights={
+                light: types.SimpleNamespace(
+                    status=_Attribute(LightsStatus.Light.LightState.OFF)
+                )
+                for light in LIGHTS
+            }
+        )
+        return {
+            "access": {"accessStatus": access},
+            "vehicleLights": {"lightsStatus": lights},
+            "charging": {
+                "chargingStatus": types.SimpleNamespace(
+                    chargingState=_Attribute(ChargingStatus.ChargingState.OFF)
+                ),
+                "plugStatus": types.SimpleNamespace(
+                    plugConnectionState=_Attribute(
+                        PlugStatus.PlugConnectionState.CONNECTED
+                    )
+                ),
+            },
+            "climatisation": {
+                "climatisationStatus": types.SimpleNamespace(
+                    climatisationState=_Attribute(
+                        ClimatizationStatus.ClimatizationState.OFF
+                    )
+                )
+            },
+        }
+
+    def _update_status(self) -> None:
+        """Tür (Statusbild) und Ladezustand (Badges) zufällig wechseln."""
+        if self._random.random() < CONFIG.change_ratio:
+            access = self.domains["access"]["accessStatus"]
+            door = access.doors["frontLeft"].openState
+            is_open = door.value == AccessStatus.Door.OpenState.OPEN
+            door.value = (
+                AccessStatus.Door.OpenState.CLOSED
+                if is_open
+                else AccessStatus.Door.OpenState.OPEN
+            )
+            access.overallStatus.value = (
+                AccessStatus.OverallState.SAFE
+                if is_open
+                else AccessStatus.OverallState.UNSAFE
+            )
+        if self._random.random() < CONFIG.change_ratio:
+            charging = self.domains["charging"]["chargingStatus"].chargingState
+            charging.value = (
+                ChargingStatus.ChargingState.OFF
+                if charging.value == ChargingStatus.ChargingState.CHARGING
+                else ChargingStatus.ChargingState.CHARGING
+            )
+
+    def update(
+        self,
+        fromDict=None,
+        updateCapabilities: bool = True,
+        updatePictures: bool = True,
+        force: bool = False,
+        selective=None,
+    ) -> None:
+        CALLS["vehicle_update"] += 1
+        # Ohne selective fragt weconnect alle Domains ab (inkl. Trips)
+        jobs = len(Domain) - 2 if selective is None else len(selective)
+        CALLS["status_jobs"] += jobs
+        # Eigener Capabilities-Job nur bei ALL_CAPABLE, sonst stehen die
+        # Capabilities ohnehin in der Fahrzeugliste
+        if updateCapabilities and selective and Domain.ALL_CAPABLE in selective:
+            CALLS["capabilities"] += 1
+            jobs += 1
+        time.sleep(CONFIG.vehicle_latency + CONFIG.domain_latency * jobs)
+        self._update_status()
+        if updatePictures:
+            self.updatePictures()
+        else:
+            self.updateStatusPicture()
+
+    def updatePictures(self) -> None:
+        CALLS["pictures"] += 1
+        for key in PICTURE_KEYS:
+            if key != "car" and self._random.random() < CONFIG.change_ratio:
+                self._variants[key] += 1
+        self.updateStatusPicture()
+
+    def updateStatusPicture(self) -> None:
+        for key in PICTURE_KEYS:
+            image = _image(self._variants[key])
+            if key in self.pictures:
+                self.pictures[key].value = image
+            else:
+                self.pictures[key] = _Attribute(image)
+
+
+class FakeWeConnect:
+    """Ersatz für weconnect.weconnect.WeConnect."""
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        spin=None,
+        tokenfile: str | None = None,
+        updateAfterLogin: bool = True,
+        loginOnInit: bool = False,
+        **kwargs,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.tokenfile = tokenfile
+        self._vehicles: dict[str, FakeVehicle] = {}
+        self.session = _FakeSession()
+        if tokenfile is not None:
+            try:
+                with open(tokenfile, encoding="utf8") as file:
+                    self.session.token = json.load(file)
+                    self.session.authorized = True
+            except (OSError, ValueError):
+                pass
+        if loginOnInit:
+            self.login()
+        if updateAfterLogin:
+            self.update()
+
+    @property
+    def vehicles(self) -> dict[str, FakeVehicle]:
+        return self._vehicles
+
+    def login(self) -> None:
+        CALLS["login"] += 1
+        time.sleep(CONFIG.login_latency)
+        self.session.token = {"access_token": "fake"}
+        self.session.authorized = True
+
+    def persistTokens(self) -> None:
+        if self.tokenfile is not None and self.session.token is not None:
+            with open(self.tokenfile, "w", encoding="utf8") as file:
+                json.dump(self.session.token, file)
+
+    def update(
+        self,
+        updateCapabilities: bool = True,
+        updatePictures: bool = True,
+        force: bool = False,
+        selective=None,
+    ) -> None:
+        CALLS["update"] += 1
+        time.sleep(CONFIG.update_latency)
+        if _FAILURES.random() < CONFIG.failure_rate:
+            CALLS["failed"] += 1
+            raise RetrievalError("simulierter Ausfall")
+        for index in range(CONFIG.fleet_size):
+            vin = f"WVWZZZ{index:011d}"
+            if vin not in self._vehicles:
+                self._vehicles[vin] = FakeVehicle(self, vin, index)
+            self._vehicles[vin].update(
+                updateCapabilities=updateCapabilities,
+                updatePictures=updatePictures,
+                selective=selective,
+            )
+
+    def fetchData(
+        self,
+        url: str,
+        force: bool = False,
+        allowEmpty: bool = False,
+        allowHttpError: bool = False,
+        allowedErrors=None,
+    ):
+        CALLS["fetch"] += 1
+        time.sleep(CONFIG.domain_latency)
+        if url.startswith(MEDIA_PREFIX):
+            vin = url[len(MEDIA_PREFIX) :].split("?", 1)[0]
+            return {
+                "data": [
+                    {"id": name, "url": LAYER_URL.format(vin=vin, layer=name)}
+                    for name in _layer_names()
+                ]
+            }
+        # Simulierte Fahrzeuge melden keine Parkposition (204); andere
+        # Endpunkte kennt das simulierte Backend nicht
+        return None
+
+
+def install(config: BackendConfig) -> None:
+    """Simuliertes Backend konfigurieren und als "weconnect" registrieren."""
+    global CONFIG  # noqa: PLW0603
+    CONFIG = config
+    _IMAGES.clear()
+    _LAYER_PNGS.clear()
+    for key in CALLS:
+        CALLS[key] = 0
+
+    package = types.ModuleType("weconnect")
+    package.__path__ = []
+    weconnect_module = types.ModuleType("weconnect.weconnect")
+    weconnect_module.WeConnect = FakeWeConnect
+    domain_module = types.ModuleType("weconnect.domain")
+    domain_module.Domain = Domain
+    errors_module = types.ModuleType("weconnect.errors")
+    for error in (
+        RetrievalError,
+        TooManyRequestsError,
+        AuthentificationError,
+        TemporaryAuthentificationError,
+        APICompatibilityError,
+    ):
+        setattr(errors_module, error.__name__, error)
+
+
+    # Statusklassen und Badges (weconnect/elements, weconnect/badges)
+    root = tempfile.mkdtemp(prefix="fake_weconnect_")
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    os.makedirs(os.path.join(root, "elements"))
+    _write_badges(os.path.join(root, "badges"))
+    elements = types.ModuleType("weconnect.elements")
+    elements.__path__ = []
+    element_modules = {}
+    for name, attribute, value in (
+        ("access_status", "AccessStatus", AccessStatus),
+        ("charging_status", "ChargingStatus", ChargingStatus),
+        ("climatization_status", "ClimatizationStatus", ClimatizationStatus),
+        ("lights_status", "LightsStatus", LightsStatus),
+        ("plug_status", "PlugStatus", PlugStatus),
+        ("vehicle", "Vehicle", FakeVehicle),
+    ):
+        module = types.ModuleType(f"weconnect.elements.{name}")
+        module.__file__ = os.path.join(root, "elements", f"{name}.py")
+        setattr(module, attribute, value)
+        setattr(elements, name, module)
+        element_modules[module.__name__] = module
+
+    package.weconnect = weconnect_module
+    package.domain = domain_module
+    package.errors = errors_module
+    package.elements = elements
+    sys.modules.update(
+        {
+            "weconnect": package,
+            "weconnect.weconnect": weconnect_module,
+            "weconnect.domain": domain_module,
+            "weconnect.errors": errors_module,
+            "weconnect.elements": elements,
+            **element_modules,
+        }
+    )
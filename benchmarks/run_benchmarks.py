@@ -0,0 +1,554 @@
+"""Offline-Benchmarks für die VW Images Integration.
+
+Startet den echten VWImagesCoordinator, die VehicleImageEntity und den
+update_images-Service gegen ein simuliertes WeConnect-Backend
+(fake_weconnect) und schreibt die Messwerte als JSON-Report.
+
+Jede Flottengröße läuft in einem eigenen Prozess, damit Spitzen-
+speicher und Importzeiten sich nicht gegenseitig beeinflussen.
+
+Beispiel:
+    python benchmarks/run_benchmarks.py --fleet-sizes 1,10,50 \
+        --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path[:0] = [str(BENCH_DIR), str(BENCH_DIR.parent)]
+
+import fake_weconnect  # noqa: E402
+
+ENTRY_ID = "benchmark"
+
+
+def _summary(samples: list[float]) -> dict:
+    """Kennzahlen einer Messreihe (Sekunden)."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], 6),
+        "median": round(statistics.median(ordered), 6),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "max": round(ordered[-1], 6),
+    }
+
+
+class _BenchConfigEntries:
+    """Minimale config_entries-Sicht für einen einzelnen Entry.
+
+    Lädt die Plattformen direkt, ohne Entity-Registry und Loader.
+    """
+
+    def __init__(self, hass, entry) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.entities: list = []
+
+    def async_entries(self, domain: str | None = None) -> list:
+        return [self.entry]
+
+    async def async_forward_entry_setups(self, entry, platforms) -> None:
+        def add_entities(new_entities, update_before_add: bool = False) -> None:
+            for entity in new_entities:
+                entity.hass = self.hass
+                entity.entity_id = (
+                    f"{entity.__class__.__name__.lower()}.bench_{len(self.entities)}"
+                )
+                self.entities.append(entity)
+
+        for platform_name in platforms:
+            module = importlib.import_module(
+                f"custom_components.vw_images.{platform_name}"
+            )
+            await module.async_setup_entry(self.hass, entry, add_entities)
+        # Listener registrieren (Fingerprint-Abgleich wie im Betrieb)
+        for entity in self.entities:
+            await entity.async_added_to_hass()
+
+    async def async_unload_platforms(self, entry, platforms) -> bool:
+        for entity in self.entities:
+            await entity.async_will_remove_from_hass()
+            for remove in entity._on_remove or ():
+                remove()
+        self.entities.clear()
+        return True
+
+    async def async_reload(self, entry_id: str) -> None:
+        pass
+
+
+def _create_entry(options: dict):
+    """ConfigEntry passend zur installierten HA-Version erzeugen."""
+    from homeassistant.config_entries import ConfigEntry
+
+    from custom_components.vw_images.const import DOMAIN
+
+    kwargs = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": "Benchmark",
+        "data": {"username": "bench@example.com", "password": "secret"},
+        "source": "user",
+        "options": options,
+        "unique_id": "bench@example.com",
+        "entry_id": ENTRY_ID,
+        "discovery_keys": {},
+        "subentries_data": None,
+    }
+    accepted = inspect.signature(ConfigEntry).parameters
+    return ConfigEntry(**{key: value for key, value in kwargs.items() if key in accepted})
+
+
+def _set_entry_state(hass, entry, state_name: str) -> None:
+    from homeassistant.config_entries import ConfigEntryState
+
+    state = ConfigEntryState[state_name]
+    if hasattr(entry, "_async_set_state"):
+        entry._async_set_state(hass, state, None)
+    else:
+        object.__setattr__(entry, "state", state)
+
+
+async def _create_hass(config_dir: str):
+    from homeassistant.core import HomeAssistant
+
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        # Ältere HA-Versionen: config_dir nachträglich setzen
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+    # Kein HTTP-Server: Views werden nur registriert
+    hass.http = types.SimpleNamespace(register_view=lambda view: None)
+    # Registries für den Abgleich verschwundener Fahrzeuge und Bildtypen
+    from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    return hass
+
+
+async def _async_settle(hass) -> None:
+    """Auf Hintergrund-Tasks warten (z. B. Schreiben des Disk-Caches)."""
+    try:
+        await hass.async_block_till_done(wait_background_tasks=True)
+    except TypeError:
+        await hass.async_block_till_done()
+        tasks = list(getattr(hass, "_background_tasks", ()))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _open_rate_window(coordinator) -> None:
+    """Rate-Limit für die Messung aufheben."""
+    coordinator._last_refresh_time = 0
+    coordinator._last_vehicle_refresh.clear()
+
+
+async def _async_measure_images(entities: list, concurrency: int, rounds: int) -> dict:
+    """Gleichzeitige async_image-Aufrufe über alle Image-Entitäten."""
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def fetch(entity) -> None:
+        nonlocal failed
+        async with semaphore:
+            start = time.perf_counter()
+            image_bytes = await entity.async_image()
+            latencies.append(time.perf_counter() - start)
+            if image_bytes is None:
+                failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(entity) for _ in range(rounds) for entity in entities))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "failed": failed,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 6),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency": _summary(latencies),
+    }
+
+
+async def _async_measure_herd(hass, coordinator, entities: list, readers: int) -> dict:
+    """Viele gleichzeitige Leser je Bild während eines Refreshs.
+
+    Store und Index des Disk-Caches werden geleert, damit jedes Bild neu
+    kodiert werden muss. Erwartet: genau ein Encode je Bild, alle übrigen
+    Leser warten auf diesen Job.
+    """
+    from custom_components.vw_images.const import DATA_IMAGE_STORE
+
+    hass.data[DATA_IMAGE_STORE].discard(lambda key: True)
+    coordinator.image_cache._images.clear()
+    keys = ("encode_on_demand", "encode_joined", "encode_stale", "pictures_encoded")
+    before = {key: coordinator.stats[key] for key in keys}
+
+    _open_rate_window(coordinator)
+    refresh = asyncio.ensure_future(coordinator.async_refresh())
+    result = await _async_measure_images(entities, readers * len(entities), readers)
+    await refresh
+    counts = {key: coordinator.stats[key] - before[key] for key in keys}
+    return {
+        **result,
+        "readers_per_image": readers,
+        **counts,
+        "encodes_per_image": round(counts["encode_on_demand"] / len(entities), 2),
+    }
+
+
+async def _async_run_scenario(args) -> dict:
+    """Alle Messungen für eine Flottengröße."""
+    fake_weconnect.install(
+        fake_weconnect.BackendConfig(
+            fleet_size=args.fleet_size,
+            image_width=args.width,
+            image_height=args.height,
+            login_latency=args.login_latency,
+            update_latency=args.update_latency,
+            vehicle_latency=args.vehicle_latency,
+            domain_latency=args.domain_latency,
+            change_ratio=args.change_ratio,
+            failure_rate=args.failure_rate,
+        )
+    )
+    tracemalloc.start()
+
+    # Importreihenfolge wie beim echten Start (vermeidet Zirkelimporte http ↔ websocket_api)
+    import homeassistant.bootstrap  # noqa: F401
+    from homeassistant.components.image import ImageEntity
+
+    from custom_components.vw_images import (
+        async_setup,
+        async_setup_entry,
+        async_unload_entry,
+    )
+    from custom_components.vw_images.config_flow import VWImagesConfigFlow
+    from custom_components.vw_images.diagnostics import (
+        async_get_config_entry_diagnostics,
+    )
+    from custom_components.vw_images.sessions import async_store_pending_session
+    from custom_components.vw_images.const import (
+        CONF_ENCODE_THREADS,
+        CONF_IMAGE_FORMAT,
+        CONF_RENDITIONS,
+        CONF_SELECTIVE_FETCH,
+        DATA_IMAGE_STORE,
+        DOMAIN,
+        SERVICE_UPDATE_IMAGES,
+    )
+
+    options = {
+        CONF_IMAGE_FORMAT: args.image_format,
+        CONF_RENDITIONS: args.renditions,
+        CONF_ENCODE_THREADS: args.encode_threads,
+        CONF_SELECTIVE_FETCH: not args.full_fetch,
+    }
+    result: dict = {"fleet_size": args.fleet_size}
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _create_hass(config_dir)
+        entry = _create_entry(options)
+        config_entries = _BenchConfigEntries(hass, entry)
+        hass.config_entries = config_entries
+        await async_setup(hass, {})
+
+        # Einrichtung: Config-Flow prüft die Zugangsdaten (Login) und übergibt
+        # die Session wie async_step_user an den Coordinator
+        flow_start = time.perf_counter()
+        flow = VWImagesConfigFlow()
+        flow.hass = hass
+        username, password = entry.data["username"], entry.data["password"]
+        await flow._validate_credentials(username, password)
+        async_store_pending_session(hass, username, password, flow._session)
+
+        # Kaltstart: leerer Cache, erster Abruf im Setup
+        _set_entry_state(hass, entry, "SETUP_IN_PROGRESS")
+        start = time.perf_counter()
+        await async_setup_entry(hass, entry)
+        result["setup_cold_s"] = round(time.perf_counter() - start, 6)
+        result["onboarding_s"] = round(time.perf_counter() - flow_start, 6)
+        result["onboarding_logins"] = fake_weconnect.CALLS["login"]
+        _set_entry_state(hass, entry, "LOADED")
+        await _async_settle(hass)
+        coordinator = hass.data[DOMAIN][ENTRY_ID]
+
+        images = [
+            entity for entity in config_entries.entities if isinstance(entity, ImageEntity)
+        ]
+        result["image_entities"] = len(images)
+
+        # Kodierzeit je Bild (vom Coordinator im Batch gemessen)
+        encode_times = []
+        for entity in images:
+            stored = coordinator.image_store.peek(entity._vin, entity._picture_key)
+            if stored is not None:
+                encode_times.append(stored.encode_time)
+        result["encode_per_image_s"] = _summary(encode_times)
+        result["encode_batch_cold_s"] = coordinator.last_encode_duration
+
+        # Vollständiger Refresh (nur geänderte Bilder werden kodiert)
+        samples = []
+        for _ in range(args.repeats):
+            _open_rate_window(coordinator)
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            samples.append(time.perf_counter() - start)
+        result["refresh_s"] = _summary(samples)
+
+        # Einzelnes Fahrzeug über den Scheduler (Button-Pfad)
+        vin = next(iter(coordinator.data))
+        samples = []
+        for _ in range(args.repeats):
+            _open_rate_window(coordinator)
+            start = time.perf_counter()
+            await coordinator.scheduler.async_request(vin)
+            samples.append(time.perf_counter() - start)
+        result["vehicle_refresh_s"] = _summary(samples)
+
+        # Service-Call update_images für alle Fahrzeuge
+        samples = []
+        for _ in range(args.repeats):
+            _open_rate_window(coordinator)
+            start = time.perf_counter()
+            await hass.services.async_call(
+                DOMAIN, SERVICE_UPDATE_IMAGES, {}, blocking=True
+            )
+            samples.append(time.perf_counter() - start)
+        result["service_call_s"] = _summary(samples)
+        await _async_settle(hass)
+
+        # async_image: warm (Store) und kalt (Store geleert → Disk-Cache)
+        result["image_warm"] = await _async_measure_images(
+            images, args.concurrency, args.rounds
+        )
+        hass.data[DATA_IMAGE_STORE].discard(lambda key: True)
+        result["image_cold"] = await _async_measure_images(
+            images, args.concurrency, 1
+        )
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        result["timings_ms"] = diagnostics["timings"]
+        result["cache_hit_rates"] = diagnostics["cache_hit_rates"]
+        result["worker_pools"] = diagnostics["worker_pools"]
+        result["imports_ms"] = diagnostics["imports_ms"]
+        result["coordinator_stats"] = dict(coordinator.stats)
+        result["circuit_breaker"] = coordinator.resilience.breaker.as_dict()
+        result["store"] = hass.data[DATA_IMAGE_STORE].state
+        result["disk_cache_bytes"] = coordinator.image_cache.total_bytes
+
+        # Schnellstart: Entitäten aus dem Snapshot, Login im Hintergrund
+        await coordinator.image_cache.async_flush()
+        await async_unload_entry(hass, entry)
+        _set_entry_state(hass, entry, "SETUP_IN_PROGRESS")
+        start = time.perf_counter()
+        await async_setup_entry(hass, entry)
+        result["setup_fast_s"] = round(time.perf_counter() - start, 6)
+        _set_entry_state(hass, entry, "LOADED")
+        images = [
+            entity for entity in config_entries.entities if isinstance(entity, ImageEntity)
+        ]
+        if images:
+            start = time.perf_counter()
+            await images[0].async_image()
+            result["first_image_fast_s"] = round(time.perf_counter() - start, 6)
+        await _async_settle(hass)
+
+        # Ansturm während eines Refreshs (Single-Flight je Bild und Rendition)
+        if images:
+            result["image_herd"] = await _async_measure_herd(
+                hass, hass.data[DOMAIN][ENTRY_ID], images, args.herd_readers
+            )
+            await _async_settle(hass)
+
+        await async_unload_entry(hass, entry)
+        await _async_settle(hass)
+        result["backend_calls"] = dict(fake_weconnect.CALLS)
+
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["memory"] = {
+            "tracemalloc_peak_mb": round(peak / 1024 / 1024, 2),
+            # Linux: KiB; enthält auch von PIL außerhalb von Python belegten Speicher
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        }
+        await hass.async_stop(force=True)
+
+    return result
+
+
+def _worker_command(args, fleet_size: int) -> list[str]:
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        "--fleet-size",
+        str(fleet_size),
+    ]
+    for name in (
+        "width",
+        "height",
+        "login_latency",
+        "update_latency",
+        "vehicle_latency",
+        "domain_latency",
+        "change_ratio",
+        "failure_rate",
+        "image_format",
+        "encode_threads",
+        "repeats",
+        "rounds",
+        "concurrency",
+        "herd_readers",
+    ):
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    if args.full_fetch:
+        command.append("--full-fetch")
+    if args.renditions:
+        command += ["--renditions", ",".join(args.renditions)]
+    return command
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--fleet-sizes",
+        default="1,10,50",
+        help="Kommagetrennte Flottengrößen (1–200)",
+    )
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=576)
+    parser.add_argument("--login-latency", type=float, default=0.5)
+    parser.add_argument("--update-latency", type=float, default=0.3)
+    parser.add_argument("--vehicle-latency", type=float, default=0.02)
+    parser.add_argument("--domain-latency", type=float, default=0.005)
+    parser.add_argument("--change-ratio", type=float, default=0.25)
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Anteil simulierter Backend-Ausfälle je Abruf (Retries/Breaker)",
+    )
+    parser.add_argument(
+        "--full-fetch",
+        action="store_true",
+        help="Alle WeConnect-Domains abrufen statt nur der für Bilder nötigen",
+    )
+    parser.add_argument(
+        "--image-format", choices=("png", "webp", "jpeg"), default="png"
+    )
+    parser.add_argument(
+        "--renditions",
+        type=lambda value: [item for item in value.split(",") if item],
+        default=[],
+        help="Zusätzliche Renditionen, z. B. medium,thumbnail",
+    )
+    parser.add_argument("--encode-threads", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="async_image-Aufrufe je Entität (warm)"
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--herd-readers",
+        type=int,
+        default=50,
+        help="Gleichzeitige Leser je Bild während eines Refreshs",
+    )
+    parser.add_argument("--output", type=Path, help="JSON-Report schreiben")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--fleet-size", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.fleet_sizes = [int(size) for size in args.fleet_sizes.split(",") if size]
+    for size in args.fleet_sizes + [args.fleet_size]:
+        if not 1 <= size <= 200:
+            parser.error("Flottengröße muss zwischen 1 und 200 liegen")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.worker:
+        result = asyncio.run(_async_run_scenario(args))
+        print(json.dumps(result))
+        return 0
+
+    scenarios = []
+    for fleet_size in args.fleet_sizes:
+        print(f"Flotte {fleet_size} ...", file=sys.stderr)
+        process = subprocess.run(
+            _worker_command(args, fleet_size),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if process.returncode != 0:
+            sys.stderr.write(process.stderr)
+            return process.returncode
+        scenarios.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "verbose", "worker", "fleet_size")
+        },
+        "scenarios": scenarios,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
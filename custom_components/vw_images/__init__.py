@@ -5,20 +5,41 @@ als Image-Entität bereit. Bilder werden nur on-demand aktualisiert
 (Button oder Service-Call).
 """
 
+import asyncio
 import logging
+import os
 import re
+import time
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.helpers.device_registry import DeviceEntry
 
-from .const import DOMAIN, SERVICE_UPDATE_IMAGES
-from .coordinator import VWImagesCoordinator
+from .const import (
+    ATTR_MAX_PARALLEL,
+    CONF_FAST_START,
+    DEFAULT_FAST_START,
+    DEFAULT_MAX_PARALLEL,
+    DOMAIN,
+    MAX_MAX_PARALLEL,
+    SERVICE_UPDATE_IMAGES,
+)
+from .coordinator import VWImagesCoordinator, token_file_path
+from .image_cache import VWImageCache
+from .imports import async_import_dependencies
+from .scheduler import REFRESH_DEFERRED, REFRESH_DONE
+from .views import VWImageView
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.IMAGE, Platform.BUTTON]
+PLATFORMS = [Platform.IMAGE, Platform.BUTTON, Platform.SENSOR]
 
 # VIN: 17 Zeichen, alphanumerisch ohne I, O, Q
 VIN_REGEX = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
@@ -26,66 +47,211 @@ VIN_REGEX = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
 SERVICE_SCHEMA = vol.Schema(
     {
         vol.Optional("vin"): vol.All(str, vol.Match(r"^[A-HJ-NPR-Z0-9]{17}$")),
+        vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_MAX_PARALLEL)
+        ),
     }
 )
 
+# Ergebnis je Fahrzeug in der Service-Antwort
+RESULT_UPDATED = "updated"
+RESULT_RATE_LIMITED = "rate_limited"
+RESULT_QUEUED = "queued"
+RESULT_FAILED = "failed"
+
+
+def _picture_fingerprints(coordinator: VWImagesCoordinator) -> dict[str, dict]:
+    """Fingerprints je VIN und Bildtyp (Vergleich vor/nach dem Abruf)."""
+    return {
+        vin: dict(vehicle_data.get("fingerprints", {}))
+        for vin, vehicle_data in (coordinator.data or {}).items()
+    }
+
+
+async def _async_update_entry(
+    coordinator: VWImagesCoordinator, target_vin: str | None
+) -> dict[str, dict]:
+    """Einen Account aktualisieren, Ergebnis je betroffener VIN."""
+    before = _picture_fingerprints(coordinator)
+    start = time.monotonic()
+    result = await coordinator.scheduler.async_request(target_vin)
+    duration = round(time.monotonic() - start, 3)
+    after = _picture_fingerprints(coordinator)
+
+    status = {
+        REFRESH_DONE: RESULT_UPDATED,
+        REFRESH_DEFERRED: RESULT_RATE_LIMITED,
+    }.get(result, RESULT_FAILED)
+    # Zurückgestellt: der Scheduler holt die Anfrage nach, sobald das
+    # Fenster öffnet (frühestens zum geplanten nachlaufenden Abruf)
+    next_run_in = coordinator.scheduler.state["next_run_in"] or 0.0
+    vins = [target_vin] if target_vin else list(after or before)
+    response = {}
+    for vin in vins:
+        old, new = before.get(vin, {}), after.get(vin, {})
+        response[vin] = {
+            "status": status,
+            "duration": duration,
+            "changed": sorted(key for key in new if new[key] != old.get(key)),
+        }
+        if status == RESULT_RATE_LIMITED:
+            retry_in = round(max(next_run_in, coordinator.seconds_until_allowed(vin)), 1)
+            if retry_in > 0:
+                response[vin]["retry_in"] = retry_in
+            else:
+                # Fenster schon offen: nur eingereiht, kein Rate-Limit
+                response[vin]["status"] = RESULT_QUEUED
+    return response
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Globales Setup: Service registrieren."""
+    """Globales Setup: Service registrieren, Abhängigkeiten vorladen."""
+    # weconnect/PIL im Hintergrund importieren, bevor Login oder
+    # Config-Flow sie brauchen (blockiert den Event-Loop nicht)
+    hass.async_create_background_task(
+        async_import_dependencies(hass), f"{DOMAIN} import dependencies"
+    )
 
-    async def handle_update_images(call: ServiceCall) -> None:
-        """Service-Handler: Fahrzeugbilder aktualisieren."""
-        target_vin = call.data.get("vin")
+    async def handle_update_images(call: ServiceCall) -> ServiceResponse:
+        """Service-Handler: Fahrzeugbilder aller Accounts parallel aktualisieren.
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            _LOGGER.warning("Kein VW Images Eintrag konfiguriert")
-            return
+        Höchstens max_parallel Accounts gleichzeitig; die Dauer des Calls
+        entspricht damit dem langsamsten statt der Summe aller Accounts.
+        """
+        target_vin = call.data.get("vin")
+        semaphore = asyncio.Semaphore(call.data[ATTR_MAX_PARALLEL])
 
-        for entry in entries:
+        coordinators = []
+        for entry in hass.config_entries.async_entries(DOMAIN):
             if entry.state.name != "LOADED":
                 continue
-
-            coordinator: VWImagesCoordinator = hass.data[DOMAIN].get(entry.entry_id)
+            coordinator: VWImagesCoordinator | None = hass.data[DOMAIN].get(
+                entry.entry_id
+            )
             if coordinator is None:
                 continue
+            if target_vin and not (coordinator.data and target_vin in coordinator.data):
+                continue
+            coordinators.append(coordinator)
 
-            if target_vin:
-                if coordinator.data and target_vin in coordinator.data:
-                    _LOGGER.debug("Aktualisiere Bild für VIN ***%s", target_vin[-4:])
-                    await coordinator.async_request_refresh()
-            else:
-                _LOGGER.debug("Aktualisiere alle Fahrzeugbilder")
-                await coordinator.async_request_refresh()
+        if not coordinators:
+            _LOGGER.warning(
+                "Kein VW Images Eintrag %s",
+                f"mit VIN ***{target_vin[-4:]}" if target_vin else "konfiguriert",
+            )
+            return {"vehicles": {}} if call.return_response else None
+
+        async def _async_update(coordinator: VWImagesCoordinator) -> dict:
+            async with semaphore:
+                return await _async_update_entry(coordinator, target_vin)
+
+        if target_vin:
+            _LOGGER.debug("Aktualisiere Bild für VIN ***%s", target_vin[-4:])
+        else:
+            _LOGGER.debug("Aktualisiere alle Fahrzeugbilder (%d Accounts)", len(coordinators))
+        results = await asyncio.gather(
+            *(_async_update(coordinator) for coordinator in coordinators)
+        )
+
+        if not call.return_response:
+            return None
+        return {
+            "vehicles": {
+                vin: result for response in results for vin, result in response.items()
+            }
+        }
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_UPDATE_IMAGES,
         handle_update_images,
         schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
+    # Renditionen (medium, thumbnail) per HTTP ausliefern
+    hass.http.register_view(VWImageView(hass))
+
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Config-Entry einrichten: Coordinator starten, Plattformen laden."""
     hass.data.setdefault(DOMAIN, {})
+    start = time.monotonic()
 
     coordinator = VWImagesCoordinator(hass, entry)
 
-    # Erster Datenabruf (inkl. Login)
-    await coordinator.async_config_entry_first_refresh()
+    # Persistenten Bild-Cache laden (Bilder sofort nach Neustart verfügbar)
+    with coordinator.timings.measure("setup_cache_load"):
+        await coordinator.image_cache.async_load()
+        if coordinator.exporter is not None:
+            await coordinator.exporter.async_load()
+
+    # Schnellstart: Entitäten aus dem Snapshot, Login im Hintergrund
+    fast_start = entry.options.get(
+        CONF_FAST_START, DEFAULT_FAST_START
+    ) and coordinator.async_set_cached_data()
+
+    if not fast_start:
+        # Erster Datenabruf (inkl. Login)
+        with coordinator.timings.measure("setup_first_refresh"):
+            await coordinator.async_config_entry_first_refresh()
 
     # Coordinator speichern
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    # Plattformen laden (image, button)
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Plattformen laden (image, button, sensor)
+    with coordinator.timings.measure("setup_platforms"):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if fast_start:
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_background_first_refresh(),
+            name=f"{DOMAIN} first refresh {entry.entry_id}",
+        )
+
+    # Verschwundene Fahrzeuge entfernen – jetzt und nach jedem Abruf
+    # (neue Fahrzeuge ergänzen die Plattformen selbst)
+    coordinator.async_remove_stale_devices()
+    entry.async_on_unload(
+        coordinator.async_add_listener(coordinator.async_remove_stale_devices)
+    )
 
+    # Optional: Trigger-Entitäten beobachten und im Intervall abrufen
+    coordinator.auto_refresh.async_start()
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    duration = time.monotonic() - start
+    coordinator.timings.record("setup_entry", duration)
+    _LOGGER.info(
+        "VW Images Setup in %.2f s abgeschlossen (%s)",
+        duration,
+        "Schnellstart aus Cache" if fast_start else "mit Live-Abruf",
+    )
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Optionen geändert: Bildtypen direkt übernehmen, sonst neu laden.
+
+    Reine Datenänderungen (Reauth) ignorieren – der Reauth-Flow lädt den
+    Entry selbst neu.
+    """
+    coordinator: VWImagesCoordinator | None = hass.data.get(DOMAIN, {}).get(
+        entry.entry_id
+    )
+    if coordinator is not None:
+        if not coordinator.options_changed():
+            return
+        if not coordinator.requires_reload():
+            await coordinator.async_apply_picture_types()
+            return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Config-Entry entladen und WeConnect-Session beenden."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -98,3 +264,30 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             coordinator.async_cleanup()
 
     return unload_ok
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: DeviceEntry
+) -> bool:
+    """Gerät manuell entfernen – nur für Fahrzeuge, die nicht mehr im Account sind."""
+    coordinator: VWImagesCoordinator | None = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is None or not coordinator.data:
+        return True
+    return not any(
+        domain == DOMAIN
+        and (identifier in coordinator.data or identifier == entry.entry_id)
+        for domain, identifier in device_entry.identifiers
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Config-Entry entfernt: Bild-Cache und gespeicherte Tokens löschen."""
+    await VWImageCache(hass, entry.entry_id).async_remove()
+
+    def _remove_tokens() -> None:
+        try:
+            os.remove(token_file_path(hass, entry.entry_id))
+        except FileNotFoundError:
+            pass
+
+    await hass.async_add_executor_job(_remove_tokens)
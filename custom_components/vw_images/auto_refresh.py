@@ -0,0 +1,269 @@
+"""Automatische Aktualisierung für die VW Images Integration (optional).
+
+Statt fester Automationen beobachtet die Integration selbst konfigurierte
+Trigger-Entitäten (z. B. Türschloss oder Ladezustand) und aktualisiert
+die Bilder kurz nach einer Änderung. Zusätzlich läuft ein Intervall:
+kurz, solange das Fahrzeug aktiv ist, lang im geparkten Zustand. Ein
+Tagesbudget begrenzt die Zahl der WeConnect-Abrufe.
+
+Alle Abrufe laufen über den RefreshScheduler und damit durch Rate-Limit
+und Bündelung.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AUTO_REFRESH_ACTIVE_PERIOD,
+    AUTO_REFRESH_DEBOUNCE,
+    CONF_ACTIVE_INTERVAL,
+    CONF_AUTO_REFRESH,
+    CONF_DAILY_BUDGET,
+    CONF_PARKED_INTERVAL,
+    CONF_TRIGGER_ENTITIES,
+    DEFAULT_ACTIVE_INTERVAL,
+    DEFAULT_AUTO_REFRESH,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_PARKED_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import VWImagesCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anlass eines automatischen Abrufs
+REASON_TRIGGER = "trigger"
+REASON_INTERVAL = "interval"
+
+
+class DailyBudget:
+    """Zähler der WeConnect-Abrufe des laufenden Tages (lokale Zeit)."""
+
+    def __init__(self, limit: int) -> None:
+        """Initialisiere das Budget."""
+        self.limit = limit
+        self._day = dt_util.now().date()
+        self._used = 0
+
+    def _roll_over(self) -> None:
+        """Um Mitternacht zurücksetzen."""
+        today = dt_util.now().date()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    @property
+    def used(self) -> int:
+        """Heute verbrauchte Abrufe."""
+        self._roll_over()
+        return self._used
+
+    @property
+    def remaining(self) -> int:
+        """Heute noch verfügbare Abrufe."""
+        return max(0, self.limit - self.used)
+
+    def record(self) -> None:
+        """Einen Abruf verbuchen (auch manuelle zählen gegen das Budget)."""
+        self._roll_over()
+        self._used += 1
+
+    @staticmethod
+    def seconds_until_reset() -> float:
+        """Sekunden bis Mitternacht (lokale Zeit)."""
+        now = dt_util.now()
+        midnight = dt_util.start_of_local_day(now) + timedelta(days=1)
+        return max(0.0, (midnight - now).total_seconds())
+
+
+class AutoRefresh:
+    """Trigger- und intervallgesteuerte Abrufe eines Accounts."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: VWImagesCoordinator) -> None:
+        """Initialisiere mit den Optionen des Config-Entries."""
+        self.hass = hass
+        self._coordinator = coordinator
+        options = coordinator.config_entry.options
+        self.enabled: bool = options.get(CONF_AUTO_REFRESH, DEFAULT_AUTO_REFRESH)
+        self._trigger_entities: list[str] = options.get(CONF_TRIGGER_ENTITIES, [])
+        self._active_interval = (
+            options.get(CONF_ACTIVE_INTERVAL, DEFAULT_ACTIVE_INTERVAL) * 60
+        )
+        self._parked_interval = (
+            options.get(CONF_PARKED_INTERVAL, DEFAULT_PARKED_INTERVAL) * 60
+        )
+        self.budget = DailyBudget(options.get(CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET))
+        self._last_activity: float | None = None
+        self._fingerprints: dict[str, dict] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_debounce: CALLBACK_TYPE | None = None
+        self._unsub_interval: CALLBACK_TYPE | None = None
+        self._next_refresh: float | None = None
+        self.stats: Counter[str] = Counter()
+
+    @property
+    def active(self) -> bool:
+        """Ob das Fahrzeug gerade aktiv ist (Trigger oder Bildänderung)."""
+        return (
+            self._last_activity is not None
+            and self.hass.loop.time() - self._last_activity < AUTO_REFRESH_ACTIVE_PERIOD
+        )
+
+    @property
+    def state(self) -> dict:
+        """Zustand für Diagnose und Attribute."""
+        now = self.hass.loop.time()
+        return {
+            "enabled": self.enabled,
+            "active": self.active,
+            "trigger_entities": len(self._trigger_entities),
+            "interval": self._interval(),
+            "next_refresh_in": (
+                max(0.0, round(self._next_refresh - now, 1))
+                if self._next_refresh is not None
+                else None
+            ),
+            "budget": self.budget.limit,
+            "budget_used": self.budget.used,
+            "budget_remaining": self.budget.remaining,
+            **self.stats,
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Trigger beobachten und Intervall starten (nur wenn aktiviert)."""
+        if not self.enabled:
+            return
+        if self._trigger_entities:
+            self._unsubs.append(
+                async_track_state_change_event(
+                    self.hass, self._trigger_entities, self._async_trigger_changed
+                )
+            )
+        self._unsubs.append(
+            self._coordinator.async_add_listener(self._async_coordinator_updated)
+        )
+        self._async_schedule_interval()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Beobachtung und Timer beenden."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        for unsub in (self._unsub_debounce, self._unsub_interval):
+            if unsub is not None:
+                unsub()
+        self._unsub_debounce = self._unsub_interval = None
+        self._next_refresh = None
+
+    @callback
+    def _async_trigger_changed(self, event: Event) -> None:
+        """Trigger-Entität geändert: nach kurzer Ruhephase abrufen."""
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is None or new_state is None:
+            return
+        states = {old_state.state, new_state.state}
+        if len(states) == 1 or states & {STATE_UNAVAILABLE, STATE_UNKNOWN}:
+            # Nur echte Zustandswechsel, keine Attribut-Updates oder Ausfälle
+            return
+
+        self.stats["triggers"] += 1
+        self._last_activity = self.hass.loop.time()
+        if self._unsub_debounce is not None:
+            # Mehrere Trigger kurz hintereinander → ein Abruf
+            self.stats["debounced"] += 1
+            self._unsub_debounce()
+        self._unsub_debounce = async_call_later(
+            self.hass, AUTO_REFRESH_DEBOUNCE, self._async_debounce_fired
+        )
+
+    @callback
+    def _async_debounce_fired(self, _now) -> None:
+        self._unsub_debounce = None
+        self._async_refresh(REASON_TRIGGER)
+
+    @callback
+    def _async_interval_fired(self, _now) -> None:
+        self._unsub_interval = None
+        self._next_refresh = None
+        self._async_refresh(REASON_INTERVAL)
+
+    @callback
+    def _async_refresh(self, reason: str) -> None:
+        """Automatischen Abruf anstoßen, sofern das Budget reicht."""
+        if not self.budget.remaining:
+            self.stats["budget_exhausted"] += 1
+            _LOGGER.debug("Tagesbudget verbraucht, automatischer Abruf entfällt")
+            self._async_schedule_interval()
+            return
+        self.stats[f"refresh_{reason}"] += 1
+        self._coordinator.config_entry.async_create_background_task(
+            self.hass,
+            self._async_request_refresh(),
+            name=f"vw_images auto refresh {self._coordinator.config_entry.entry_id}",
+        )
+
+    async def _async_request_refresh(self) -> None:
+        """Abruf über den Scheduler, danach das Intervall in jedem Fall neu planen.
+
+        Der Coordinator benachrichtigt seine Listener nach wiederholten
+        Fehlschlägen nicht; ohne Neuplanung endeten die automatischen
+        Abrufe mit dem ersten Ausfall.
+        """
+        try:
+            await self._coordinator.scheduler.async_request()
+        finally:
+            if self._unsubs:
+                # Noch aktiv (nicht zwischenzeitlich beendet)
+                self._async_schedule_interval()
+
+    @callback
+    def _async_coordinator_updated(self) -> None:
+        """Nach jedem Abruf: Aktivität erkennen und Intervall neu planen."""
+        for vin, vehicle_data in (self._coordinator.data or {}).items():
+            fingerprints = vehicle_data.get("fingerprints", {})
+            previous = self._fingerprints.get(vin)
+            if previous is not None and previous != fingerprints:
+                # Geänderte Statusbilder: Türen, Licht, Laden o. Ä. in Bewegung
+                self._last_activity = self.hass.loop.time()
+            self._fingerprints[vin] = fingerprints
+        self._async_schedule_interval()
+
+    def _interval(self) -> float:
+        """Abstand bis zum nächsten Intervall-Abruf in Sekunden.
+
+        Das Restbudget wird gleichmäßig auf den restlichen Tag verteilt;
+        ist es verbraucht, geht es nach Mitternacht weiter.
+        """
+        interval = self._active_interval if self.active else self._parked_interval
+        remaining = self.budget.remaining
+        until_reset = self.budget.seconds_until_reset()
+        if not remaining:
+            return until_reset + 1
+        return max(interval, until_reset / remaining)
+
+    @callback
+    def _async_schedule_interval(self) -> None:
+        """Nächsten Intervall-Abruf (neu) planen."""
+        if self._unsub_interval is not None:
+            self._unsub_interval()
+        delay = self._interval()
+        self._next_refresh = self.hass.loop.time() + delay
+        self._unsub_interval = async_call_later(
+            self.hass, delay, self._async_interval_fired
+        )
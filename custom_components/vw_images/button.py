@@ -4,7 +4,7 @@ import logging
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -19,15 +19,28 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Button-Entitäten aus Config-Entry einrichten."""
+    """Button-Entitäten aus Config-Entry einrichten (neue Fahrzeuge nach jedem Abruf)."""
     coordinator: VWImagesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    known: set[str] = set()
 
-    entities = [
-        UpdateImageButton(coordinator, vin, vehicle_data)
-        for vin, vehicle_data in coordinator.data.items()
-    ]
+    @callback
+    def _async_add_new_entities() -> None:
+        data = coordinator.data or {}
+        if data:
+            # Verschwundene Fahrzeuge vergessen, damit sie bei der Rückkehr
+            # wieder einen Button bekommen
+            known.intersection_update(data)
+        new_vins = [vin for vin in data if vin not in known]
+        if not new_vins:
+            return
+        known.update(new_vins)
+        async_add_entities(
+            UpdateImageButton(coordinator, vin, coordinator.data[vin])
+            for vin in new_vins
+        )
 
-    async_add_entities(entities)
+    _async_add_new_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_entities))
 
 
 class UpdateImageButton(CoordinatorEntity[VWImagesCoordinator], ButtonEntity):
@@ -63,6 +76,6 @@ class UpdateImageButton(CoordinatorEntity[VWImagesCoordinator], ButtonEntity):
         return True
 
     async def async_press(self) -> None:
-        """Button gedrückt: Fahrzeugbilder aktualisieren."""
+        """Button gedrückt: Bilder dieses Fahrzeugs aktualisieren."""
         _LOGGER.debug("Bild-Update angefordert für ***%s", self._vin[-4:])
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.scheduler.async_request(self._vin)
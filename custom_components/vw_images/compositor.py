@@ -0,0 +1,437 @@
+"""Lokale Komposition der Fahrzeugbilder für die VW Images Integration.
+
+weconnect lädt bei jedem Abruf sämtliche Bildebenen (3/4-Ansicht,
+Vogelperspektive, Türen, Fenster, Lichter) neu herunter und setzt daraus
+die vier Bildtypen zusammen. Die Ebenen ändern sich aber praktisch nie.
+Hier werden sie einmal je Fahrzeug geladen (und auf der Festplatte
+gecacht); die Bildtypen entstehen lokal aus Ebenen, Badges und dem
+aktuellen Fahrzeugstatus. Neu gerendert wird nur ein Bildtyp, dessen
+Status-Signatur sich geändert hat.
+
+Nachgebildet ist Vehicle.updateStatusPicture aus weconnect 0.60.
+Reine Funktionen ohne Zugriff auf Home Assistant (blocking → Executor).
+"""
+
+import io
+import logging
+import os
+from dataclasses import dataclass
+
+from .encoder import image_fingerprint
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bildliste eines Fahrzeugs (wie weconnect Vehicle.updatePictures)
+MEDIA_URL = "https://emea.bff.cariad.digital/media/v2/vehicle-images/{vin}?resolution=2x"
+LAYER_TIMEOUT = 30
+
+# Basisansichten, aus denen die Bildtypen entstehen
+LAYER_CAR = "car_34view"
+LAYER_BIRDVIEW = "car_birdview"
+
+# Statusnamen in weconnect → Namen der Bildebenen
+_DOOR_LAYERS = {
+    "frontLeft": "door_left_front",
+    "frontRight": "door_right_front",
+    "rearLeft": "door_left_back",
+    "rearRight": "door_right_back",
+}
+_WINDOW_LAYERS = {
+    "frontLeft": "window_left_front",
+    "frontRight": "window_right_front",
+    "rearLeft": "window_left_back",
+    "rearRight": "window_right_back",
+    "sunRoof": "sunroof",
+}
+
+# Abstand der Badges bzw. Warnleuchten untereinander (Pixel)
+_BADGE_SPACING = 110
+
+
+class MissingLayersError(Exception):
+    """Fahrzeug liefert keine Basisansicht (lokale Komposition nicht möglich)."""
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleState:
+    """Bildrelevanter Fahrzeugstatus.
+
+    status_layers: Ebenen auf der Vogelperspektive (Türen, Fenster, Licht),
+    badges: Badge-Namen, warning_lights: (Message-ID, Icon) je Warnleuchte.
+    """
+
+    status_layers: tuple[str, ...]
+    badges: tuple[str, ...]
+    warning_lights: tuple[tuple[str, object], ...]
+
+    @property
+    def badge_signature(self) -> tuple:
+        """Signatur der Badge-Überlagerung (Icons zählen über ihre ID)."""
+        return (self.badges, tuple(key for key, _ in self.warning_lights))
+
+
+@dataclass(slots=True)
+class RenderedPicture:
+    """Gerendertes Bild samt Signatur und Fingerprint.
+
+    Hat wie die weconnect-Bildreferenzen ein Attribut value (None, sobald
+    die Pixel nach dem Kodieren freigegeben sind).
+    """
+
+    signature: tuple
+    value: object
+    fingerprint: str
+
+
+class _ReleasedPicture:
+    """Referenz auf ein freigegebenes Bild: value rendert es neu (blocking)."""
+
+    __slots__ = ("_compositor", "_vin", "_picture_key", "fingerprint")
+
+    def __init__(
+        self, compositor: "PictureCompositor", vin: str, picture_key: str, fingerprint: str
+    ) -> None:
+        self._compositor = compositor
+        self._vin = vin
+        self._picture_key = picture_key
+        self.fingerprint = fingerprint
+
+    @property
+    def value(self):
+        return self._compositor.rebuild(self._vin, self._picture_key)
+
+
+def download_layers(
+    weconnect, vin: str, names: frozenset[str] | None = None
+) -> tuple[dict[str, bytes], frozenset[str]]:
+    """Bildebenen eines Fahrzeugs herunterladen (blocking).
+
+    Die Bildliste kommt über fetchData; die PNG-Dateien selbst lädt
+    weconnect (wie in Vehicle.updatePictures) direkt über die Session,
+    fetchData liefert nur JSON. Verlangt der Server eine neue Anmeldung,
+    meldet sich weconnect neu an und der Download wird einmal wiederholt.
+    Mit names werden nur diese Ebenen geladen. Liefert die geladenen
+    Ebenen und die IDs der Ebenen, die mit einem HTTP-Fehler scheiterten.
+    Nur "keine Bilder" (204, 403, 404) ergibt eine leere Bildliste;
+    vorübergehende Fehler (5xx, 429) lösen RetrievalError aus.
+    """
+    from requests import codes
+
+    data = weconnect.fetchData(
+        MEDIA_URL.format(vin=vin),
+        allowHttpError=True,
+        allowedErrors=[codes["no_content"], codes["forbidden"], codes["not_found"]],
+    )
+    if not data or "data" not in data:
+        return {}, frozenset()
+    layers = {}
+    failed = set()
+    for image in data["data"]:
+        if names is not None and image["id"] not in names:
+            continue
+        content = _download_layer(weconnect, image["url"])
+        if content is None:
+            failed.add(image["id"])
+        else:
+            layers[image["id"]] = content
+    return layers, frozenset(failed)
+
+
+def _download_layer(weconnect, url: str) -> bytes | None:
+    """Eine Bildebene laden; None bei sonstigen HTTP-Fehlern."""
+    from requests import RequestException, codes
+    from weconnect.errors import RetrievalError
+
+    try:
+        response = weconnect.session.get(url, timeout=LAYER_TIMEOUT)
+        if response.status_code == codes["unauthorized"]:
+            _LOGGER.info("WeConnect verlangt eine neue Anmeldung (Bildebenen)")
+            weconnect.login()
+            response = weconnect.session.get(url, timeout=LAYER_TIMEOUT)
+            if response.status_code != codes["ok"]:
+                raise RetrievalError(
+                    "Bildebene auch nach erneuter Anmeldung nicht abrufbar"
+                    f" (Status {response.status_code})"
+                )
+    except RequestException as err:
+        raise RetrievalError("Bildebenen konnten nicht geladen werden") from err
+    if response.status_code != codes["ok"]:
+        _LOGGER.warning(
+            "Bildebene nicht geladen (Status %d), neuer Versuch beim nächsten Abruf",
+            response.status_code,
+        )
+        return None
+    return response.content
+
+
+def decode_layers(layers: dict[str, bytes]) -> dict:
+    """PNG-Bytes der Ebenen in PIL-Bilder (RGBA) umwandeln (blocking)."""
+    from PIL import Image
+
+    images = {}
+    for name, data in layers.items():
+        with Image.open(io.BytesIO(data)) as image:
+            images[name] = image.convert("RGBA")
+    if LAYER_CAR not in images and LAYER_BIRDVIEW not in images:
+        raise MissingLayersError("Keine Basisansicht in den Bildebenen")
+    return images
+
+
+def load_badges() -> dict:
+    """Badge-Grafiken aus dem weconnect-Paket laden (blocking)."""
+    from PIL import Image
+    from weconnect.elements import vehicle as vehicle_module
+
+    directory = os.path.join(os.path.dirname(vehicle_module.__file__), "..", "badges")
+    badges = {}
+    for badge in vehicle_module.Vehicle.Badge:
+        with Image.open(os.path.join(directory, f"{badge.value}.png")) as image:
+            badge_image = image.convert("RGBA")
+        badge_image.thumbnail((100, 100))
+        badges[badge.value] = badge_image
+    return badges
+
+
+def read_state(vehicle) -> VehicleState:  # noqa: C901
+    """Bildrelevanten Status aus den weconnect-Domains lesen."""
+    from weconnect.elements.access_status import AccessStatus
+    from weconnect.elements.charging_status import ChargingStatus
+    from weconnect.elements.climatization_status import ClimatizationStatus
+    from weconnect.elements.lights_status import LightsStatus
+    from weconnect.elements.plug_status import PlugStatus
+
+    domains = vehicle.domains
+    layers: list[str] = []
+    badges: set[str] = set()
+
+    def _status(domain: str, key: str):
+        if domain in domains and key in domains[domain]:
+            return domains[domain][key]
+        return None
+
+    access = _status("access", "accessStatus")
+    if access is not None and not access.error.enabled:
+        if access.overallStatus.enabled:
+            if access.overallStatus.value == AccessStatus.OverallState.SAFE:
+                badges.add("locked")
+            elif access.overallStatus.value == AccessStatus.OverallState.UNSAFE:
+                badges.add("unlocked")
+            else:
+                badges.add("warning")
+        for openings, names, open_state in (
+            (access.doors, _DOOR_LAYERS, AccessStatus.Door.OpenState),
+            (access.windows, _WINDOW_LAYERS, AccessStatus.Window.OpenState),
+        ):
+            for name, opening in openings.items():
+                name = names.get(name, name)
+                state = opening.openState.value
+                if state == open_state.OPEN:
+                    layers.append(f"{name}_overlay")
+                elif state == open_state.CLOSED:
+                    layers.append(name)
+                elif state in (open_state.INVALID, open_state.UNKNOWN):
+                    layers.append(name)
+                    badges.add("warning")
+    else:
+        # Ohne Zugangsstatus: alles geschlossen darstellen
+        layers.extend(_DOOR_LAYERS.values())
+        layers.extend(name for name in _WINDOW_LAYERS.values() if name != "sunroof")
+
+    lights = _status("vehicleLights", "lightsStatus")
+    if lights is not None:
+        for name, light in lights.lights.items():
+            if light.status.value == LightsStatus.Light.LightState.ON:
+                layers.append(f"light_{_DOOR_LAYERS.get(name, name)}")
+
+    charging = _status("charging", "chargingStatus")
+    if charging is not None:
+        if charging.chargingState.value in (
+            ChargingStatus.ChargingState.CHARGING,
+            ChargingStatus.ChargingState.CHARGE_PURPOSE_REACHED_CONSERVATION,
+            ChargingStatus.ChargingState.CONSERVATION,
+        ):
+            badges.add("charging")
+        elif charging.chargingState.value == ChargingStatus.ChargingState.ERROR:
+            badges.add("warning")
+
+    plug = _status("charging", "plugStatus")
+    if (
+        plug is not None
+        and plug.plugConnectionState.value == PlugStatus.PlugConnectionState.CONNECTED
+    ):
+        badges.add("connected")
+
+    climatisation = _status("climatisation", "climatisationStatus")
+    if climatisation is not None:
+        badges.update(
+            {
+                ClimatizationStatus.ClimatizationState.COOLING: ("cooling",),
+                ClimatizationStatus.ClimatizationState.HEATING: ("heating",),
+                ClimatizationStatus.ClimatizationState.VENTILATION: ("ventilating",),
+            }.get(climatisation.climatisationState.value, ())
+        )
+
+    parking = _status("parking", "parkingPosition")
+    if (
+        parking is not None
+        and parking.latitude.enabled
+        and parking.latitude.value is not None
+    ):
+        badges.add("parking")
+
+    warning_lights = []
+    warnings = _status("vehicleHealthWarnings", "warningLights")
+    if warnings is not None and warnings.warningLights.enabled:
+        for key, warning_light in warnings.warningLights.items():
+            if warning_light.icon.enabled:
+                warning_lights.append((str(key), warning_light.icon.value))
+
+    return VehicleState(
+        status_layers=tuple(layers),
+        badges=tuple(sorted(badges)),
+        warning_lights=tuple(warning_lights),
+    )
+
+
+class PictureCompositor:
+    """Bildebenen je Fahrzeug und zuletzt gerenderte Bildtypen."""
+
+    def __init__(self) -> None:
+        """Initialisiere ohne Ebenen (Badges werden beim ersten Rendern geladen)."""
+        self._layers: dict[str, dict] = {}
+        self._badges: dict | None = None
+        self._rendered: dict[str, dict[str, RenderedPicture]] = {}
+        # Status des letzten Renderns (zum Neuaufbau freigegebener Bilder)
+        self._states: dict[str, VehicleState] = {}
+
+    @property
+    def vehicles(self) -> list[str]:
+        """VINs mit geladenen Bildebenen."""
+        return list(self._layers)
+
+    def has_layers(self, vin: str) -> bool:
+        """Ob die Ebenen des Fahrzeugs im Speicher liegen."""
+        return vin in self._layers
+
+    def set_layers(self, vin: str, layers: dict) -> None:
+        """Ebenen übernehmen; alle Bildtypen werden neu gerendert."""
+        self._layers[vin] = layers
+        self._rendered.pop(vin, None)
+        self._states.pop(vin, None)
+
+    def remove(self, vin: str) -> None:
+        """Ebenen und Bilder eines Fahrzeugs verwerfen."""
+        self._layers.pop(vin, None)
+        self._rendered.pop(vin, None)
+        self._states.pop(vin, None)
+
+    def get(self, vin: str, picture_key: str):
+        """Zuletzt gerendertes Bild eines Bildtyps (freigegebene als Referenz)."""
+        picture = self._rendered.get(vin, {}).get(picture_key)
+        if picture is None or picture.value is not None:
+            return picture
+        return _ReleasedPicture(self, vin, picture_key, picture.fingerprint)
+
+    def release(self, vin: str) -> None:
+        """Pixel der gerenderten Bilder freigeben (nach dem Kodieren).
+
+        Signatur und Fingerprint bleiben; unveränderte Bildtypen werden
+        beim nächsten Abruf nicht neu gerendert.
+        """
+        for picture in self._rendered.get(vin, {}).values():
+            picture.value = None
+
+    def rebuild(self, vin: str, picture_key: str):
+        """Freigegebenes Bild aus Ebenen und letztem Status neu rendern (blocking).
+
+        Das Ergebnis wird nicht gehalten; None, wenn es nicht mehr existiert.
+        """
+        layers = self._layers.get(vin)
+        state = self._states.get(vin)
+        if layers is None or state is None or self.get(vin, picture_key) is None:
+            return None
+        return self._render_picture(picture_key, layers, state, {})
+
+    def render(
+        self, vin: str, vehicle, picture_keys
+    ) -> tuple[dict[str, RenderedPicture], int]:
+        """Gewählte Bildtypen aus Ebenen und aktuellem Status rendern (blocking).
+
+        Liefert die Bildtypen und die Anzahl tatsächlich neu gerenderter.
+        Bildtypen mit unveränderter Signatur werden unverändert übernommen,
+        nicht gewählte verworfen.
+        """
+        if self._badges is None:
+            self._badges = load_badges()
+        layers = self._layers[vin]
+        state = read_state(vehicle)
+        previous = self._rendered.get(vin, {})
+        signatures = {}
+        if LAYER_CAR in layers:
+            signatures["car"] = ()
+            signatures["carWithBadge"] = state.badge_signature
+        if LAYER_BIRDVIEW in layers:
+            signatures["status"] = state.status_layers
+            signatures["statusWithBadge"] = (
+                state.status_layers,
+                state.badge_signature,
+            )
+
+        rendered = {}
+        dirty = 0
+        for key, signature in signatures.items():
+            if key not in picture_keys:
+                continue
+            picture = previous.get(key)
+            if picture is None or picture.signature != signature:
+                image = self._render_picture(key, layers, state, rendered)
+                picture = RenderedPicture(signature, image, image_fingerprint(image))
+                dirty += 1
+            rendered[key] = picture
+        self._rendered[vin] = rendered
+        self._states[vin] = state
+        return rendered, dirty
+
+    def _render_picture(self, key: str, layers: dict, state: VehicleState, rendered: dict):
+        """Einen Bildtyp zusammensetzen."""
+        if key == "car":
+            return layers[LAYER_CAR]
+        if key == "carWithBadge":
+            return self._with_badges(layers[LAYER_CAR], state)
+        if key == "status":
+            return self._status_image(layers, state)
+        # statusWithBadge baut auf dem (ggf. eben gerenderten) Status-Bild auf
+        status = rendered.get("status")
+        if status is None or status.value is None:
+            return self._with_badges(self._status_image(layers, state), state)
+        return self._with_badges(status.value, state)
+
+    @staticmethod
+    def _status_image(layers: dict, state: VehicleState):
+        """Vogelperspektive mit Türen, Fenstern und Licht."""
+        image = layers[LAYER_BIRDVIEW].copy()
+        for name in state.status_layers:
+            layer = layers.get(name)
+            if layer is not None:
+                image.paste(layer, (0, 0), layer)
+        return image
+
+    def _with_badges(self, base, state: VehicleState):
+        """Badges links, Warnleuchten rechts auf eine Kopie zeichnen."""
+        from PIL import Image, ImageDraw
+
+        image = base.copy()
+        for index, badge in enumerate(state.badges):
+            badge_image = self._badges[badge]
+            image.paste(badge_image, (0, index * _BADGE_SPACING), badge_image)
+
+        width, _ = image.size
+        draw = ImageDraw.Draw(image)
+        for index, (_, icon) in enumerate(state.warning_lights):
+            offset = index * _BADGE_SPACING
+            draw.ellipse(
+                ((width - 100), offset, (width - 1), (offset + 100)), fill=(0, 0, 0, 200)
+            )
+            icon = icon.convert("RGBA").resize((64, 64), Image.LANCZOS)
+            image.paste(icon, ((width - 82), offset + 18), icon)
+        return image
@@ -1,12 +1,64 @@
 """Config-Flow für die VW Images Integration."""
 
 import logging
+import os
+from functools import partial
 
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv, selector
 
-from .const import DOMAIN
+from .const import (
+    CONF_ACTIVE_INTERVAL,
+    CONF_AUTO_REFRESH,
+    CONF_DAILY_BUDGET,
+    CONF_ENCODE_THREADS,
+    CONF_EXPORT_DIR,
+    CONF_FAST_START,
+    CONF_IMAGE_FORMAT,
+    CONF_IMAGE_QUALITY,
+    CONF_LOCAL_COMPOSITION,
+    CONF_MEMORY_BUDGET,
+    CONF_NETWORK_WORKERS,
+    CONF_PARKED_INTERVAL,
+    CONF_PER_VEHICLE,
+    CONF_PICTURE_TYPES,
+    CONF_RENDITIONS,
+    CONF_SELECTIVE_FETCH,
+    CONF_STATIC_EXPORT,
+    CONF_TRIGGER_ENTITIES,
+    CONF_VEHICLE_PICTURE_TYPES,
+    CONTENT_TYPES,
+    DEFAULT_ACTIVE_INTERVAL,
+    DEFAULT_AUTO_REFRESH,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_ENCODE_THREADS,
+    DEFAULT_EXPORT_DIR,
+    DEFAULT_FAST_START,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_IMAGE_QUALITY,
+    DEFAULT_LOCAL_COMPOSITION,
+    DEFAULT_MEMORY_BUDGET,
+    DEFAULT_NETWORK_WORKERS,
+    DEFAULT_PARKED_INTERVAL,
+    DEFAULT_PICTURE_TYPES,
+    DEFAULT_RENDITIONS,
+    DEFAULT_SELECTIVE_FETCH,
+    DEFAULT_STATIC_EXPORT,
+    DOMAIN,
+    MAX_DAILY_BUDGET,
+    MAX_ENCODE_THREADS,
+    MAX_MEMORY_BUDGET,
+    MAX_NETWORK_WORKERS,
+    MAX_REFRESH_INTERVAL,
+    PICTURE_DOMAINS,
+    RENDITION_FULL,
+    RENDITION_SIZES,
+)
+from .imports import async_import_dependencies
+from .sessions import async_store_pending_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,6 +68,15 @@ class VWImagesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    # Bei der Prüfung angemeldete Session (wird an den Coordinator übergeben)
+    _session = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Options-Flow für bestehende Einträge."""
+        return VWImagesOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Erster Schritt: Username und Passwort abfragen."""
         errors = {}
@@ -32,6 +93,14 @@ class VWImagesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
 
+                # Angemeldete Session übernimmt der Coordinator (kein 2. Login)
+                async_store_pending_session(
+                    self.hass,
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                    self._session,
+                )
+
                 # Generischer Titel statt E-Mail-Adresse (Fix #3: Keine PII im Titel)
                 return self.async_create_entry(
                     title="VW Images",
@@ -70,6 +139,12 @@ class VWImagesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 entry = self.hass.config_entries.async_get_entry(
                     self.context["entry_id"]
                 )
+                async_store_pending_session(
+                    self.hass,
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                    self._session,
+                )
                 self.hass.config_entries.async_update_entry(
                     entry, data=user_input
                 )
@@ -90,17 +165,26 @@ class VWImagesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _validate_credentials(self, username: str, password: str) -> tuple[bool, str | None]:
-        """Validiere WeConnect-Zugangsdaten. Gibt (success, error_key) zurück."""
+        """Validiere WeConnect-Zugangsdaten. Gibt (success, error_key) zurück.
+
+        Bei Erfolg bleibt die angemeldete Session in self._session.
+        """
         try:
+            # Import (erstes Öffnen) und Konstruktor blockieren → Executor
+            await async_import_dependencies(self.hass)
             from weconnect import weconnect as wc_module
 
-            wc = wc_module.WeConnect(
-                username=username,
-                password=password,
-                updateAfterLogin=False,
-                loginOnInit=False,
+            wc = await self.hass.async_add_executor_job(
+                partial(
+                    wc_module.WeConnect,
+                    username=username,
+                    password=password,
+                    updateAfterLogin=False,
+                    loginOnInit=False,
+                )
             )
             await self.hass.async_add_executor_job(wc.login)
+            self._session = wc
             return True, None
 
         except ConnectionError:
@@ -112,3 +196,202 @@ class VWImagesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except Exception:
             _LOGGER.debug("Authentifizierung fehlgeschlagen", exc_info=True)
             return False, "invalid_auth"
+
+
+class VWImagesOptionsFlow(config_entries.OptionsFlow):
+    """Options-Flow: Verhalten der Integration anpassen."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialisiere den Options-Flow."""
+        self._entry = config_entry
+        self._options: dict = {}
+
+    async def async_step_init(self, user_input=None):
+        """Optionen abfragen."""
+        errors = {}
+        if user_input is not None:
+            export_dir = _normalize_export_dir(
+                user_input.get(CONF_EXPORT_DIR, DEFAULT_EXPORT_DIR)
+            )
+            if export_dir is None:
+                errors[CONF_EXPORT_DIR] = "invalid_export_dir"
+            else:
+                # Gespeichert wird genau der geprüfte Pfad
+                user_input[CONF_EXPORT_DIR] = export_dir
+            if not user_input.get(CONF_PICTURE_TYPES):
+                errors[CONF_PICTURE_TYPES] = "no_picture_types"
+        if user_input is not None and not errors:
+            per_vehicle = user_input.pop(CONF_PER_VEHICLE, False)
+            # Auswahl je Fahrzeug bleibt erhalten, wenn sie nicht bearbeitet wird
+            self._options = {
+                **user_input,
+                CONF_VEHICLE_PICTURE_TYPES: self._entry.options.get(
+                    CONF_VEHICLE_PICTURE_TYPES, {}
+                ),
+            }
+            if per_vehicle and self._vehicles():
+                return await self.async_step_vehicles()
+            return self.async_create_entry(title="", data=self._options)
+
+        options = {**self._entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PICTURE_TYPES,
+                        default=options.get(CONF_PICTURE_TYPES, DEFAULT_PICTURE_TYPES),
+                    ): cv.multi_select({key: key for key in PICTURE_DOMAINS}),
+                    vol.Optional(CONF_PER_VEHICLE, default=False): bool,
+                    vol.Optional(
+                        CONF_FAST_START,
+                        default=options.get(CONF_FAST_START, DEFAULT_FAST_START),
+                    ): bool,
+                    vol.Optional(
+                        CONF_IMAGE_FORMAT,
+                        default=options.get(CONF_IMAGE_FORMAT, DEFAULT_IMAGE_FORMAT),
+                    ): vol.In(list(CONTENT_TYPES)),
+                    vol.Optional(
+                        CONF_IMAGE_QUALITY,
+                        default=options.get(CONF_IMAGE_QUALITY, DEFAULT_IMAGE_QUALITY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_RENDITIONS,
+                        default=options.get(CONF_RENDITIONS, DEFAULT_RENDITIONS),
+                    ): cv.multi_select(
+                        {
+                            name: f"{name} ({size} px)"
+                            for name, size in RENDITION_SIZES.items()
+                            if name != RENDITION_FULL
+                        }
+                    ),
+                    vol.Optional(
+                        CONF_MEMORY_BUDGET,
+                        default=options.get(CONF_MEMORY_BUDGET, DEFAULT_MEMORY_BUDGET),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_MEMORY_BUDGET)),
+                    vol.Optional(
+                        CONF_STATIC_EXPORT,
+                        default=options.get(CONF_STATIC_EXPORT, DEFAULT_STATIC_EXPORT),
+                    ): bool,
+                    vol.Optional(
+                        CONF_EXPORT_DIR,
+                        default=options.get(CONF_EXPORT_DIR, DEFAULT_EXPORT_DIR),
+                    ): str,
+                    vol.Optional(
+                        CONF_SELECTIVE_FETCH,
+                        default=options.get(
+                            CONF_SELECTIVE_FETCH, DEFAULT_SELECTIVE_FETCH
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_LOCAL_COMPOSITION,
+                        default=options.get(
+                            CONF_LOCAL_COMPOSITION, DEFAULT_LOCAL_COMPOSITION
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_NETWORK_WORKERS,
+                        default=options.get(
+                            CONF_NETWORK_WORKERS, DEFAULT_NETWORK_WORKERS
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_NETWORK_WORKERS)
+                    ),
+                    vol.Optional(
+                        CONF_ENCODE_THREADS,
+                        default=options.get(
+                            CONF_ENCODE_THREADS, DEFAULT_ENCODE_THREADS
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_ENCODE_THREADS)
+                    ),
+                    vol.Optional(
+                        CONF_AUTO_REFRESH,
+                        default=options.get(CONF_AUTO_REFRESH, DEFAULT_AUTO_REFRESH),
+                    ): bool,
+                    vol.Optional(
+                        CONF_TRIGGER_ENTITIES,
+                        default=options.get(CONF_TRIGGER_ENTITIES, []),
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_ACTIVE_INTERVAL,
+                        default=options.get(
+                            CONF_ACTIVE_INTERVAL, DEFAULT_ACTIVE_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_REFRESH_INTERVAL)
+                    ),
+                    vol.Optional(
+                        CONF_PARKED_INTERVAL,
+                        default=options.get(
+                            CONF_PARKED_INTERVAL, DEFAULT_PARKED_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_REFRESH_INTERVAL)
+                    ),
+                    vol.Optional(
+                        CONF_DAILY_BUDGET,
+                        default=options.get(CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_DAILY_BUDGET)
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_vehicles(self, user_input=None):
+        """Bildtypen je Fahrzeug abfragen (Abweichungen vom Account)."""
+        vehicles = self._vehicles()
+        account = self._options[CONF_PICTURE_TYPES]
+        if user_input is not None:
+            # Nur Abweichungen speichern: neue Fahrzeuge folgen dem Account
+            self._options[CONF_VEHICLE_PICTURE_TYPES] = {
+                vin: [key for key in PICTURE_DOMAINS if key in selected]
+                for vin, selected in user_input.items()
+                if vin in vehicles and set(selected) != set(account)
+            }
+            return self.async_create_entry(title="", data=self._options)
+
+        overrides = self._options[CONF_VEHICLE_PICTURE_TYPES]
+        return self.async_show_form(
+            step_id="vehicles",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        vin, default=overrides.get(vin, account)
+                    ): cv.multi_select({key: key for key in PICTURE_DOMAINS})
+                    for vin in vehicles
+                }
+            ),
+            description_placeholders={
+                "vehicles": "\n".join(
+                    f"{vin}: {name}" for vin, name in vehicles.items()
+                )
+            },
+        )
+
+    def _vehicles(self) -> dict[str, str]:
+        """Bekannte Fahrzeuge des Accounts (VIN → Name)."""
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if coordinator is None or not coordinator.data:
+            return {}
+        return {
+            vin: vehicle_data.get("nickname") or vehicle_data["model"]
+            for vin, vehicle_data in coordinator.data.items()
+        }
+
+
+def _normalize_export_dir(directory: str) -> str | None:
+    """Exportverzeichnis normalisieren, None wenn ungültig.
+
+    Es muss relativ zum Config-Ordner liegen und darin bleiben.
+    """
+    if not directory.strip():
+        return None
+    path = os.path.normpath(directory.strip())
+    if os.path.isabs(path) or path in (".", "..") or path.startswith(f"..{os.sep}"):
+        return None
+    return path
@@ -2,9 +2,141 @@
 
 DOMAIN = "vw_images"
 SERVICE_UPDATE_IMAGES = "update_images"
+# Service-Call: Accounts, die gleichzeitig aktualisiert werden
+ATTR_MAX_PARALLEL = "max_parallel"
+DEFAULT_MAX_PARALLEL = 4
+MAX_MAX_PARALLEL = 10
+
+# Optionen (Options-Flow)
+CONF_FAST_START = "fast_start"
+DEFAULT_FAST_START = True
+# Threads je Account für WeConnect-Aufrufe bzw. Bild-Extraktion/Encoding
+CONF_NETWORK_WORKERS = "network_workers"
+DEFAULT_NETWORK_WORKERS = 2
+MAX_NETWORK_WORKERS = 4
+CONF_ENCODE_THREADS = "encode_threads"
+DEFAULT_ENCODE_THREADS = 1
+MAX_ENCODE_THREADS = 4
+# Ausgabeformat, Qualität (WebP/JPEG) und zusätzliche Renditionen
+CONF_IMAGE_FORMAT = "image_format"
+DEFAULT_IMAGE_FORMAT = "png"
+CONF_IMAGE_QUALITY = "image_quality"
+DEFAULT_IMAGE_QUALITY = 85
+CONF_RENDITIONS = "renditions"
+DEFAULT_RENDITIONS: list[str] = []
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+# Nur die für die Bilder nötigen WeConnect-Domains abrufen
+CONF_SELECTIVE_FETCH = "selective_fetch"
+DEFAULT_SELECTIVE_FETCH = True
+
+# Bildebenen einmal je Fahrzeug laden und Statusbilder lokal zusammensetzen
+# (statt alle Ebenen bei jedem Abruf neu herunterzuladen); Ebenen werden
+# nur neu geladen, wenn sie im Cache fehlen
+CONF_LOCAL_COMPOSITION = "local_composition"
+DEFAULT_LOCAL_COMPOSITION = True
+# Scheitert die lokale Komposition unerwartet, lädt weconnect die Bilder;
+# nach REMOTE_PICTURES_RETRY Sekunden wird es erneut lokal versucht
+REMOTE_PICTURES_RETRY = 6 * 3600
+
+# Export als statische Dateien (z. B. www/vw_images → /local/vw_images),
+# Verzeichnis relativ zum Config-Ordner
+CONF_STATIC_EXPORT = "static_export"
+DEFAULT_STATIC_EXPORT = False
+CONF_EXPORT_DIR = "export_dir"
+DEFAULT_EXPORT_DIR = "www/vw_images"
+
+# Speicherbudget für kodierte Bilder im RAM (MB je Account)
+CONF_MEMORY_BUDGET = "memory_budget"
+DEFAULT_MEMORY_BUDGET = 32
+MAX_MEMORY_BUDGET = 512
+
+# Schlüssel in hass.data für den gemeinsamen Bild-Store aller Accounts
+DATA_IMAGE_STORE = f"{DOMAIN}_image_store"
+
+# Einmaliger Import von weconnect/PIL im Executor (Schlüssel in hass.data)
+DATA_IMPORTS = f"{DOMAIN}_imports"
+
+# Im Config-Flow angemeldete Sessions, die der Coordinator übernimmt
+# (Schlüssel in hass.data, Gültigkeit in Sekunden)
+DATA_PENDING_SESSIONS = f"{DOMAIN}_pending_sessions"
+PENDING_SESSION_TTL = 300
+
+# Renditionen: Name → maximale Kantenlänge in Pixeln (None = Originalgröße)
+RENDITION_FULL = "full"
+RENDITION_SIZES = {
+    RENDITION_FULL: None,
+    "medium": 800,
+    "thumbnail": 256,
+}
+
+# WeConnect-Domains, aus denen weconnect Overlays und Badges je Bildtyp
+# zusammensetzt (siehe Vehicle.updateStatusPicture). "parking" ist kein
+# selectivestatus-Job: die Parkposition kommt von einem eigenen Endpunkt
+PARKING_DOMAIN = "parking"
+BADGE_DOMAINS = (
+    "access",
+    "charging",
+    "climatisation",
+    PARKING_DOMAIN,
+    "vehicleHealthWarnings",
+)
+PICTURE_DOMAINS: dict[str, tuple[str, ...]] = {
+    "car": (),
+    "carWithBadge": BADGE_DOMAINS,
+    "status": ("access", "vehicleLights"),
+    "statusWithBadge": (*BADGE_DOMAINS, "vehicleLights"),
+}
+
+# Bildtypen je Account und optional je Fahrzeug (VIN → Bildtypen);
+# nicht gewählte Typen werden weder abgerufen noch kodiert oder angelegt
+CONF_PICTURE_TYPES = "picture_types"
+DEFAULT_PICTURE_TYPES: list[str] = list(PICTURE_DOMAINS)
+CONF_VEHICLE_PICTURE_TYPES = "vehicle_picture_types"
+# Options-Flow: zweiter Schritt mit Bildtypen je Fahrzeug (nicht gespeichert)
+CONF_PER_VEHICLE = "per_vehicle"
 
 # Minimaler Abstand zwischen zwei API-Aufrufen (Sekunden)
 MIN_REFRESH_INTERVAL = 60
 
+# Automatische Aktualisierung: Trigger-Entitäten, Intervalle in Minuten
+# (aktiv/geparkt) und Tagesbudget an WeConnect-Abrufen
+CONF_AUTO_REFRESH = "auto_refresh"
+DEFAULT_AUTO_REFRESH = False
+CONF_TRIGGER_ENTITIES = "trigger_entities"
+CONF_ACTIVE_INTERVAL = "active_interval"
+DEFAULT_ACTIVE_INTERVAL = 15
+CONF_PARKED_INTERVAL = "parked_interval"
+DEFAULT_PARKED_INTERVAL = 360
+MAX_REFRESH_INTERVAL = 1440
+CONF_DAILY_BUDGET = "daily_budget"
+DEFAULT_DAILY_BUDGET = 48
+MAX_DAILY_BUDGET = 500
+# Ruhephase nach einem Trigger (Sekunden) – der VW-Server braucht ohnehin
+# einige Sekunden, bis der neue Status abrufbar ist
+AUTO_REFRESH_DEBOUNCE = 30
+# Fahrzeug gilt so lange nach Trigger oder Bildänderung als aktiv (Sekunden)
+AUTO_REFRESH_ACTIVE_PERIOD = 30 * 60
+
+# Wiederholungen bei Netzwerkfehlern (Versuche gesamt, Backoff in Sekunden)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 30
+
+# Circuit Breaker: Sperre nach BREAKER_THRESHOLD gescheiterten Abrufen in
+# Folge, Sperrdauer verdoppelt sich bei erneutem Fehlschlag bis zum Maximum
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 300
+BREAKER_MAX_COOLDOWN = 3600
+
 # Maximale Bildgröße in Pixeln (Breite × Höhe)
 MAX_IMAGE_PIXELS = 4096 * 4096
+
+# Persistenter Bild-Cache unter .storage
+CACHE_STORAGE_VERSION = 1
+MAX_DISK_CACHE_BYTES = 50 * 1024 * 1024
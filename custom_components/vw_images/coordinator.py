@@ -1,28 +1,104 @@
 """Daten-Koordinator für die VW Images Integration."""
 
+import asyncio
 import logging
+import os
 import time
+from collections import Counter
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
-from .const import MIN_REFRESH_INTERVAL
+from .const import (
+    CONF_IMAGE_FORMAT,
+    CONF_IMAGE_QUALITY,
+    CONF_ENCODE_THREADS,
+    CONF_EXPORT_DIR,
+    CONF_LOCAL_COMPOSITION,
+    CONF_MEMORY_BUDGET,
+    CONF_NETWORK_WORKERS,
+    CONF_PICTURE_TYPES,
+    CONF_RENDITIONS,
+    CONF_SELECTIVE_FETCH,
+    CONF_STATIC_EXPORT,
+    CONF_VEHICLE_PICTURE_TYPES,
+    DATA_IMAGE_STORE,
+    DOMAIN,
+    DEFAULT_ENCODE_THREADS,
+    DEFAULT_EXPORT_DIR,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_IMAGE_QUALITY,
+    DEFAULT_LOCAL_COMPOSITION,
+    DEFAULT_MEMORY_BUDGET,
+    DEFAULT_NETWORK_WORKERS,
+    DEFAULT_PICTURE_TYPES,
+    DEFAULT_RENDITIONS,
+    DEFAULT_SELECTIVE_FETCH,
+    DEFAULT_STATIC_EXPORT,
+    MIN_REFRESH_INTERVAL,
+    PARKING_DOMAIN,
+    PICTURE_DOMAINS,
+    REMOTE_PICTURES_RETRY,
+    RENDITION_FULL,
+)
+from .auto_refresh import AutoRefresh
+from .compositor import (
+    LAYER_BIRDVIEW,
+    LAYER_CAR,
+    MissingLayersError,
+    PictureCompositor,
+    decode_layers,
+    download_layers,
+)
+from .encoder import EncodeSettings, encode_renditions, image_fingerprint
+from .export import StaticExporter
+from .image_cache import VWImageCache
+from .image_store import StoredImage, VWImageStore
+from .imports import async_import_dependencies
+from .metrics import TimingStats
+from .resilience import (
+    ERROR_FAIL,
+    ERROR_IGNORE,
+    ERROR_RETRY,
+    CircuitOpenError,
+    ResilientCaller,
+)
+from .scheduler import RefreshScheduler
+from .sessions import async_pop_pending_session
+from .workers import POOL_ENCODE, POOL_NETWORK, WorkerPool
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _picture_selection(options, vin: str | None = None) -> tuple[str, ...]:
+    """Bildtypen aus den Optionen (Fahrzeug-Auswahl vor Account-Auswahl)."""
+    selected = options.get(CONF_PICTURE_TYPES, DEFAULT_PICTURE_TYPES)
+    if vin is not None:
+        selected = options.get(CONF_VEHICLE_PICTURE_TYPES, {}).get(vin, selected)
+    # Reihenfolge wie PICTURE_DOMAINS (Entitäten, Komposition)
+    return tuple(key for key in PICTURE_DOMAINS if key in selected)
+
+
+def token_file_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Pfad der WeConnect-Tokendatei eines Config-Entries (unter .storage)."""
+    return hass.config.path(".storage", DOMAIN, f"{entry_id}.tokens.json")
+
+
 class VWImagesCoordinator(DataUpdateCoordinator):
     """Koordinator für VW Images.
 
     Kein automatisches Polling – Updates werden nur on-demand
-    über async_request_refresh() ausgelöst (Button oder Service-Call).
-    Rate-Limiting: Mindestens MIN_REFRESH_INTERVAL Sekunden zwischen Aufrufen.
+    über den RefreshScheduler ausgelöst (Button oder Service-Call).
+    Rate-Limiting: Mindestens MIN_REFRESH_INTERVAL Sekunden zwischen Aufrufen,
+    Anfragen im Fenster holt der Scheduler gebündelt nach.
     """
 
     config_entry: ConfigEntry
@@ -37,105 +113,1142 @@ class VWImagesCoordinator(DataUpdateCoordinator):
         )
         self.config_entry = entry
         self._weconnect = None
+        # weconnect/PIL werden einmalig im Executor importiert
+        self._dependencies_imported = False
+        self._token_file = token_file_path(hass, entry.entry_id)
+        # Zuletzt gespeicherte Tokens (nur bei Änderung neu schreiben)
+        self._persisted_token: dict | None = None
         self._last_refresh_time: float = 0
+        self._last_vehicle_refresh: dict[str, float] = {}
+        # Zähler für Cache-Treffer/-Fehlschläge (Fingerprint-Vergleich, Encoding)
+        self.stats: Counter[str] = Counter()
+        # Zeitmessungen je Phase (Login, Abruf, Extraktion, Encoding)
+        self.timings = TimingStats()
+        # Wiederholungen mit Backoff und Circuit Breaker für Login/Abruf
+        self.resilience = ResilientCaller(self._classify_error, self.stats)
+        # Persistenter Cache: liefert Bilder direkt nach dem Neustart
+        self.image_cache = VWImageCache(hass, entry.entry_id)
+        # Optional: geänderte Bilder als statische Dateien schreiben
+        self.exporter: StaticExporter | None = (
+            StaticExporter(
+                hass,
+                entry.entry_id,
+                entry.options.get(CONF_EXPORT_DIR, DEFAULT_EXPORT_DIR),
+            )
+            if entry.options.get(CONF_STATIC_EXPORT, DEFAULT_STATIC_EXPORT)
+            else None
+        )
+        # Fertig kodierte Bilder, aus denen die Entitäten lesen
+        # (ein Store für alle Accounts, Budget je Account)
+        options = entry.options
+        store: VWImageStore = hass.data.setdefault(DATA_IMAGE_STORE, VWImageStore())
+        store.set_budget(
+            entry.entry_id,
+            options.get(CONF_MEMORY_BUDGET, DEFAULT_MEMORY_BUDGET) * 1024 * 1024,
+        )
+        self.image_store = store.namespace(entry.entry_id)
+        # Generation und Fingerprint je (VIN, Bildtyp): die Generation steigt
+        # mit jedem neuen Fingerprint. Bei Bedarf kodierte Bilder einer
+        # älteren Generation landen nicht mehr im Store.
+        self._picture_versions: dict[tuple[str, str], tuple[int, str | None]] = {}
+        self.encode_settings = EncodeSettings(
+            image_format=options.get(CONF_IMAGE_FORMAT, DEFAULT_IMAGE_FORMAT),
+            quality=options.get(CONF_IMAGE_QUALITY, DEFAULT_IMAGE_QUALITY),
+            renditions=(
+                RENDITION_FULL,
+                *options.get(CONF_RENDITIONS, DEFAULT_RENDITIONS),
+            ),
+        )
+        # Eigene Threads für WeConnect (Netzwerk) und Extraktion/Encoding
+        # (CPU) statt des gemeinsamen Executors von Home Assistant
+        self.network_pool = WorkerPool(
+            POOL_NETWORK,
+            options.get(CONF_NETWORK_WORKERS, DEFAULT_NETWORK_WORKERS),
+        )
+        self.encode_pool = WorkerPool(
+            POOL_ENCODE,
+            options.get(CONF_ENCODE_THREADS, DEFAULT_ENCODE_THREADS),
+        )
+        # Bildebenen je Fahrzeug, Bildtypen entstehen lokal (None = weconnect
+        # lädt die Bilder bei jedem Abruf); Fahrzeuge, die sich nicht lokal
+        # darstellen lassen, bleiben bei den Bildern von weconnect
+        self.compositor: PictureCompositor | None = (
+            PictureCompositor()
+            if options.get(CONF_LOCAL_COMPOSITION, DEFAULT_LOCAL_COMPOSITION)
+            else None
+        )
+        # VIN → Zeitpunkt des nächsten lokalen Versuchs (time.monotonic;
+        # None = Fahrzeug liefert keine Basisansicht)
+        self._remote_pictures: dict[str, float | None] = {}
+        # Unvollständig geladene Ebenen je VIN: bisherige PNG-Bytes und die
+        # fehlenden Ebenen (werden beim nächsten Abruf nachgeladen)
+        self._incomplete_layers: dict[str, tuple[dict[str, bytes], frozenset[str]]] = {}
+        # Optionen beim Start; Änderungen der Bildtypen gelten ohne Neustart
+        self._options = dict(options)
+        # Abrufe und die Übernahme geänderter Bildtypen nie gleichzeitig
+        self._update_lock = asyncio.Lock()
+        self.last_encode_duration: float | None = None
+        # Bündelt Refresh-Anfragen und holt rate-limitierte nach
+        self.scheduler = RefreshScheduler(hass, self)
+        # Optionale automatische Abrufe samt Tagesbudget
+        self.auto_refresh = AutoRefresh(hass, self)
 
     async def _async_setup(self) -> None:
-        """Einmalige Einrichtung: WeConnect-Login."""
+        """WeConnect-Session aufbauen.
+
+        Direkt nach Einrichtung oder Reauth wird die im Config-Flow
+        angemeldete Session übernommen. Sonst wird die Session aus
+        gespeicherten Tokens ohne Login wiederhergestellt; weconnect erneuert
+        abgelaufene Access-Tokens selbst per Refresh-Token. Ein vollständiger
+        Login erfolgt nur ohne (gültige) Tokens.
+        """
+        await self._async_import_dependencies()
         from weconnect import weconnect as wc_module
+        from weconnect.errors import (
+            AuthentificationError,
+            TemporaryAuthentificationError,
+        )
 
         username = self.config_entry.data[CONF_USERNAME]
         password = self.config_entry.data[CONF_PASSWORD]
 
-        self._weconnect = wc_module.WeConnect(
-            username=username,
-            password=password,
-            updateAfterLogin=False,
-            loginOnInit=False,
+        weconnect = async_pop_pending_session(self.hass, username, password)
+        if weconnect is not None:
+            self.stats["session_handoff"] += 1
+            # Tokens künftig in der Tokendatei dieses Entries sichern
+            weconnect.tokenfile = self._token_file
+            self._weconnect = weconnect
+            await self.network_pool.async_run(self._persist_tokens, weconnect)
+            _LOGGER.info("WeConnect-Session aus der Einrichtung übernommen")
+            return
+
+        # Liest die Tokendatei (blocking → Netzwerk-Pool)
+        weconnect = await self.network_pool.async_run(
+            partial(
+                wc_module.WeConnect,
+                username=username,
+                password=password,
+                tokenfile=self._token_file,
+                updateAfterLogin=False,
+                loginOnInit=False,
+            )
         )
 
+        if weconnect.session.authorized:
+            self.stats["token_reused"] += 1
+            self._persisted_token = weconnect.session.token
+            self._weconnect = weconnect
+            _LOGGER.info("WeConnect-Session aus gespeicherten Tokens wiederhergestellt")
+            return
+
         _LOGGER.info("WeConnect Login wird durchgeführt...")
         try:
-            await self.hass.async_add_executor_job(self._weconnect.login)
-        except Exception as err:
-            self._weconnect = None
+            await self.resilience.async_call(
+                "login",
+                partial(
+                    self.timings.async_executor_job,
+                    self.hass,
+                    "login",
+                    weconnect.login,
+                    pool=self.network_pool,
+                ),
+            )
+        except TemporaryAuthentificationError:
+            raise
+        except AuthentificationError as err:
+            # Nur echte Anmeldefehler lösen Reauth aus, Netzwerkfehler nicht
+            self.stats["login_failed"] += 1
             raise ConfigEntryAuthFailed(
                 "WeConnect-Anmeldung fehlgeschlagen. Bitte Zugangsdaten prüfen."
             ) from err
+        self._weconnect = weconnect
+        await self.network_pool.async_run(self._persist_tokens, weconnect)
         _LOGGER.info("WeConnect Login erfolgreich")
 
+    async def _async_import_dependencies(self) -> None:
+        """Auf den Import von weconnect/PIL im Executor warten (Wartezeit messen)."""
+        if self._dependencies_imported:
+            return
+        with self.timings.measure("import_wait"):
+            await async_import_dependencies(self.hass)
+        self._dependencies_imported = True
+
+    def _persist_tokens(self, weconnect) -> None:
+        """Tokens speichern, wenn weconnect sie neu ausgestellt hat (blocking)."""
+        token = weconnect.session.token
+        if not token or token == self._persisted_token:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._token_file), exist_ok=True)
+            # Datei vor dem Schreiben nur für den Besitzer lesbar anlegen
+            # (weconnect öffnet sie mit der Standard-umask)
+            os.close(os.open(self._token_file, os.O_WRONLY | os.O_CREAT, 0o600))
+            os.chmod(self._token_file, 0o600)
+            weconnect.persistTokens()
+        except OSError:
+            _LOGGER.debug("WeConnect-Tokens konnten nicht gespeichert werden", exc_info=True)
+            return
+        self._persisted_token = dict(token)
+        self.stats["token_saved"] += 1
+
+    def _discard_tokens(self) -> None:
+        """Gespeicherte Tokens löschen (Refresh-Token ungültig, blocking)."""
+        self._persisted_token = None
+        try:
+            os.remove(self._token_file)
+        except FileNotFoundError:
+            pass
+
     async def _async_update_data(self) -> dict:
-        """Fahrzeugdaten von WeConnect abrufen (mit Rate-Limiting)."""
-        # Rate-Limiting: Mindestabstand zwischen Aufrufen
-        now = time.monotonic()
-        elapsed = now - self._last_refresh_time
-        if self._last_refresh_time > 0 and elapsed < MIN_REFRESH_INTERVAL:
-            _LOGGER.debug(
-                "Rate-Limit: Nächster Refresh in %d Sekunden möglich",
-                int(MIN_REFRESH_INTERVAL - elapsed),
-            )
-            # Gib gecachte Daten zurück statt erneut abzufragen
-            if self.data is not None:
-                return self.data
-            # Beim allerersten Mal trotzdem durchlassen
+        """Fahrzeugdaten abrufen (nie parallel zur Übernahme der Bildtypen)."""
+        async with self._update_lock:
+            return await self._async_fetch_vehicles()
+
+    async def _async_fetch_vehicles(self) -> dict:
+        """Fahrzeugdaten von WeConnect abrufen.
+
+        Das Rate-Limit setzt der RefreshScheduler vor dem Aufruf durch.
+        Bei Netzwerk- und Serverfehlern bleibt die Session samt Tokens
+        erhalten; verworfen werden Tokens nur, wenn weconnect sie nicht
+        mehr erneuern kann.
+        """
+        await self._async_import_dependencies()
+        from weconnect.errors import (
+            AuthentificationError,
+            RetrievalError,
+            TemporaryAuthentificationError,
+        )
 
         try:
             if self._weconnect is None:
                 await self._async_setup()
 
             _LOGGER.debug("Aktualisiere WeConnect Fahrzeugdaten...")
-            await self.hass.async_add_executor_job(self._weconnect.update)
+            self.auto_refresh.budget.record()
+            await self.resilience.async_call(
+                "update",
+                partial(
+                    self.timings.async_executor_job,
+                    self.hass,
+                    "update",
+                    partial(self._weconnect.update, **self._update_kwargs()),
+                    pool=self.network_pool,
+                ),
+            )
+            await self._async_fetch_parking_positions(self._weconnect.vehicles)
             self._last_refresh_time = time.monotonic()
+            # Von weconnect erneuerte Tokens für den nächsten Start sichern
+            await self.network_pool.async_run(self._persist_tokens, self._weconnect)
 
-            vehicles = {}
-            for vin, vehicle in self._weconnect.vehicles.items():
-                model = self._safe_attr(vehicle, "model")
-                nickname = self._safe_attr(vehicle, "nickname")
-
-                # Bild-Referenzen speichern, nicht das gesamte Vehicle-Objekt
-                picture_refs = {}
-                try:
-                    if hasattr(vehicle, "pictures"):
-                        for key in ("car", "carWithBadge", "status", "statusWithBadge"):
-                            if key in vehicle.pictures:
-                                picture_refs[key] = vehicle.pictures[key]
-                except Exception:
-                    _LOGGER.debug("Konnte Bild-Referenzen nicht lesen für ***%s", vin[-4:])
-
-                vehicles[vin] = {
-                    "vin": vin,
-                    "model": model or "VW Fahrzeug",
-                    "nickname": nickname,
-                    "picture_refs": picture_refs,
-                }
+            vehicles = {
+                vin: self._build_vehicle_data(vin, vehicle)
+                for vin, vehicle in self._weconnect.vehicles.items()
+            }
+            for vin in vehicles:
+                self._last_vehicle_refresh[vin] = self._last_refresh_time
+            await self._async_process_vehicles(vehicles)
 
             _LOGGER.info("%d Fahrzeug(e) geladen", len(vehicles))
             return vehicles
 
         except ConfigEntryAuthFailed:
             raise
+        except CircuitOpenError as err:
+            # Entitäten liefern währenddessen die Bilder aus dem Cache
+            raise UpdateFailed(
+                f"WeConnect nach wiederholten Fehlern gesperrt ({err.remaining:.0f} s)"
+            ) from err
+        except TemporaryAuthentificationError as err:
+            _LOGGER.warning("Token-Erneuerung vorübergehend nicht möglich")
+            self.stats["transient_errors"] += 1
+            raise UpdateFailed("WeConnect-Anmeldung vorübergehend gestört") from err
+        except AuthentificationError as err:
+            _LOGGER.warning("WeConnect-Tokens ungültig, nächster Abruf meldet neu an")
+            self._async_count_session_reset("auth")
+            await self.network_pool.async_run(self._discard_tokens)
+            raise UpdateFailed("WeConnect-Anmeldung abgelaufen") from err
         except ConnectionError as err:
-            _LOGGER.warning("Netzwerkfehler, Session wird zurückgesetzt")
-            self._weconnect = None
+            _LOGGER.warning("Netzwerkfehler bei WeConnect, Session bleibt erhalten")
+            self.stats["transient_errors"] += 1
             raise UpdateFailed("Netzwerkfehler bei WeConnect-Verbindung") from err
         except TimeoutError as err:
-            _LOGGER.warning("Zeitüberschreitung, Session wird zurückgesetzt")
-            self._weconnect = None
+            _LOGGER.warning("Zeitüberschreitung bei WeConnect, Session bleibt erhalten")
+            self.stats["transient_errors"] += 1
             raise UpdateFailed("Zeitüberschreitung bei WeConnect-Verbindung") from err
+        except RetrievalError as err:
+            _LOGGER.warning("WeConnect nicht erreichbar, Session bleibt erhalten")
+            self.stats["transient_errors"] += 1
+            raise UpdateFailed("Fehler beim Abrufen der Fahrzeugdaten") from err
         except Exception as err:
+            # Neuaufbau aus den gespeicherten Tokens, kein erneuter Login
             _LOGGER.warning("WeConnect Update fehlgeschlagen, Session wird zurückgesetzt")
-            self._weconnect = None
+            self._async_count_session_reset("error")
             raise UpdateFailed("Fehler beim Abrufen der Fahrzeugdaten") from err
 
-    def async_cleanup(self) -> None:
-        """WeConnect-Session aufräumen."""
-        if self._weconnect is not None:
-            _LOGGER.debug("Beende WeConnect-Session")
+    async def _async_process_vehicles(self, vehicles: dict) -> None:
+        """Bilder aller Fahrzeuge zusammensetzen, vergleichen und kodieren.
+
+        Danach hält weder coordinator.data noch der Compositor dekodierte
+        Bilder; Store, Cache und Export enthalten nur noch aktuelle Fahrzeuge
+        und gewählte Bildtypen.
+        """
+        self._picture_versions = {
+            key: version
+            for key, version in self._picture_versions.items()
+            if key[0] in vehicles
+        }
+        if self.compositor is not None:
+            for vin in self.compositor.vehicles:
+                if vin not in vehicles:
+                    self.compositor.remove(vin)
+            for vin in [vin for vin in self._remote_pictures if vin not in vehicles]:
+                del self._remote_pictures[vin]
+            for vin in [vin for vin in self._incomplete_layers if vin not in vehicles]:
+                del self._incomplete_layers[vin]
+        await self._async_compose_pictures(vehicles)
+
+        # Fingerprints der Rohpixel berechnen (blocking → Encode-Pool)
+        await self.timings.async_executor_job(
+            self.hass,
+            "fingerprint",
+            self._compute_fingerprints,
+            vehicles,
+            pool=self.encode_pool,
+        )
+
+        # Geänderte Bilder sofort gebündelt kodieren, danach die Pixel
+        # freigeben (bei Bedarf rendert der Compositor sie neu)
+        selection = {vin: self.picture_types(vin) for vin in vehicles}
+        self.image_store.retain(selection)
+        await self._async_encode_changed(vehicles)
+        for vin in vehicles:
+            self._async_release_pictures(vin, vehicles[vin])
+
+        await self.image_cache.async_update_vehicles(vehicles, selection)
+        if self.exporter is not None:
+            await self.exporter.async_remove_stale(selection)
+
+    @callback
+    def _async_release_pictures(self, vin: str, vehicle_data: dict) -> None:
+        """Referenzen auf dekodierte Bilder nach dem Kodieren aufgeben.
+
+        Lokal zusammengesetzte Bilder werden freigegeben; Bilder von
+        weconnect (Rückfallpfad) gehören weconnect und bleiben dort.
+        """
+        del vehicle_data["picture_refs"]
+        if self.compositor is not None:
+            self.compositor.release(vin)
+
+    def picture_types(self, vin: str | None = None) -> tuple[str, ...]:
+        """Gewählte Bildtypen eines Fahrzeugs (ohne VIN: des Accounts)."""
+        return _picture_selection(self.config_entry.options, vin)
+
+    @staticmethod
+    def _selected_domains(options) -> set[str]:
+        """WeConnect-Domains aller gewählten Bildtypen des Accounts."""
+        selections = [
+            _picture_selection(options),
+            *options.get(CONF_VEHICLE_PICTURE_TYPES, {}).values(),
+        ]
+        return {
+            domain
+            for selected in selections
+            for key in selected
+            for domain in PICTURE_DOMAINS.get(key, ())
+        }
+
+    def options_changed(self) -> bool:
+        """Ob sich die Optionen seit Setup bzw. letzter Übernahme geändert haben.
+
+        False bei reinen Datenänderungen (z. B. neue Zugangsdaten per Reauth).
+        """
+        return self._options != dict(self.config_entry.options)
+
+    def requires_reload(self) -> bool:
+        """Ob geänderte Optionen einen Neustart des Entries erfordern.
+
+        Die Auswahl der Bildtypen wird ohne Neustart übernommen
+        (async_apply_picture_types).
+        """
+        live = (CONF_PICTURE_TYPES, CONF_VEHICLE_PICTURE_TYPES)
+
+        def _static(options) -> dict:
+            return {key: value for key, value in options.items() if key not in live}
+
+        return _static(self._options) != _static(self.config_entry.options)
+
+    async def async_apply_picture_types(self) -> None:
+        """Geänderte Bildtypen übernehmen, ohne neu anzumelden.
+
+        Die Daten entstehen neu aus dem vorhandenen WeConnect-Stand: nicht
+        mehr gewählte Bildtypen verschwinden samt Entitäten, neu gewählte
+        werden – soweit schon abrufbar – sofort kodiert. Brauchen sie
+        Domains, die bisher nicht abgefragt wurden, folgt ein Abruf.
+        Läuft nach einem laufenden Abruf; bereits übernommene Optionen
+        werden übersprungen.
+        """
+        async with self._update_lock:
+            if self.options_changed():
+                await self._async_apply_picture_types()
+
+    async def _async_apply_picture_types(self) -> None:
+        """Bildtypen aus den aktuellen Optionen übernehmen (unter _update_lock)."""
+        domains_before = self._selected_domains(self._options)
+        self._options = dict(self.config_entry.options)
+        if self._weconnect is None or self.data is None:
+            # Noch kein Live-Abruf (Schnellstart): nur Auswahl anwenden
+            if self.data is not None:
+                self.async_set_updated_data(
+                    {
+                        vin: {
+                            **vehicle_data,
+                            "picture_keys": [
+                                key
+                                for key in vehicle_data["picture_keys"]
+                                if key in self.picture_types(vin)
+                            ],
+                        }
+                        for vin, vehicle_data in self.data.items()
+                    }
+                )
+            return
+
+        _LOGGER.debug("Übernehme geänderte Bildtypen ohne Neustart")
+        try:
+            vehicles = {
+                vin: self._build_vehicle_data(vin, vehicle)
+                for vin, vehicle in self._weconnect.vehicles.items()
+            }
+            await self._async_process_vehicles(vehicles)
+        except Exception:
+            _LOGGER.warning(
+                "Bildtypen konnten nicht übernommen werden, lade beim nächsten Abruf",
+                exc_info=True,
+            )
+            self._async_request_refresh_for_picture_types()
+            return
+        self.async_set_updated_data(vehicles)
+
+        if self.config_entry.options.get(
+            CONF_SELECTIVE_FETCH, DEFAULT_SELECTIVE_FETCH
+        ) and not self._selected_domains(self._options) <= domains_before:
+            self._async_request_refresh_for_picture_types()
+
+    @callback
+    def _async_request_refresh_for_picture_types(self) -> None:
+        """Abruf anfordern (Rate-Limit über den Scheduler, kein Login)."""
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.scheduler.async_request(),
+            name=f"vw_images picture types {self.config_entry.entry_id}",
+        )
+
+    def _update_kwargs(self, vin: str | None = None) -> dict:
+        """Argumente für WeConnect.update bzw. Vehicle.update (mit vin).
+
+        Im selektiven Modus fragt weconnect nur die Domains ab, aus denen
+        Overlays und Badges der gewählten Bildtypen entstehen (statt aller
+        Domains inkl. Trips). Capabilities bleiben eingeschaltet: weconnect
+        liest sie ohne eigenen Job aus der Fahrzeugliste, mit
+        updateCapabilities=False würde es sie dagegen leeren. Mit lokaler
+        Komposition lädt weconnect Bilder nur noch für Fahrzeuge, die sich
+        nicht lokal darstellen lassen.
+        """
+        kwargs = {}
+        if self.compositor is not None:
+            kwargs["updatePictures"] = (
+                vin in self._remote_pictures
+                if vin is not None
+                else bool(self._remote_pictures)
+            )
+        if not self.config_entry.options.get(
+            CONF_SELECTIVE_FETCH, DEFAULT_SELECTIVE_FETCH
+        ):
+            return kwargs
+
+        from weconnect.domain import Domain
+
+        domains = self._selected_domains(self.config_entry.options)
+        # Parkposition lädt _fetch_parking_positions über den eigenen Endpunkt
+        domains.discard(PARKING_DOMAIN)
+        # weconnect erwartet mindestens einen Job pro Statusabfrage
+        domains = domains or {Domain.ACCESS.value}
+        return {
+            **kwargs,
+            "updateCapabilities": True,
+            "selective": [Domain(domain) for domain in sorted(domains)],
+        }
+
+    async def _async_fetch_parking_positions(self, vehicles: dict) -> None:
+        """Parkpositionen für das Parken-Badge laden (nur im selektiven Modus).
+
+        weconnect lädt die Parkposition nur zusammen mit einem "parking"-Job,
+        den selectivestatus nicht kennt. Ohne selektiven Abruf übernimmt
+        weconnect das selbst.
+        """
+        if not self.config_entry.options.get(
+            CONF_SELECTIVE_FETCH, DEFAULT_SELECTIVE_FETCH
+        ) or PARKING_DOMAIN not in self._selected_domains(self.config_entry.options):
+            return
+        await self.timings.async_executor_job(
+            self.hass,
+            "parking",
+            self._fetch_parking_positions,
+            self._weconnect,
+            list(vehicles.values()),
+            pool=self.network_pool,
+        )
+
+    @staticmethod
+    def _fetch_parking_positions(weconnect, vehicles: list) -> None:
+        """Parkpositionen über fetchData laden (blocking).
+
+        fetchData erneuert abgelaufene Tokens selbst. Fehlt die Parkposition
+        (Fahrzeug fährt, keine Berechtigung), wird sie wie in weconnect
+        deaktiviert; andere Fehler kosten nur das Badge, nicht den Abruf.
+        """
+        from requests import codes
+        from weconnect.errors import RetrievalError, TooManyRequestsError
+
+        for vehicle in vehicles:
+            vin = vehicle.vin.value
             try:
-                if hasattr(self._weconnect, "logout"):
-                    self._weconnect.logout()
-            except Exception:
-                _LOGGER.debug("Fehler beim Logout", exc_info=True)
-            self._weconnect = None
+                data = weconnect.fetchData(
+                    "https://emea.bff.cariad.digital/vehicle/v1/vehicles/"
+                    f"{vin}/parkingposition",
+                    allowEmpty=True,
+                    allowHttpError=True,
+                    allowedErrors=[
+                        codes["not_found"],
+                        codes["no_content"],
+                        codes["bad_gateway"],
+                        codes["forbidden"],
+                    ],
+                )
+            except TooManyRequestsError:
+                raise
+            except RetrievalError:
+                _LOGGER.debug("Parkposition für ***%s nicht abrufbar", vin[-4:])
+                continue
+            domain = vehicle.domains.get(PARKING_DOMAIN)
+            position = domain.get("parkingPosition") if domain is not None else None
+            if data:
+                from weconnect.elements.parking_position import ParkingPosition
+                from weconnect.elements.vehicle import DomainDict
+
+                if domain is None:
+                    domain = vehicle.domains[PARKING_DOMAIN] = DomainDict(
+                        localAddress=PARKING_DOMAIN, parent=vehicle
+                    )
+                if position is not None:
+                    position.update(fromDict=data)
+                else:
+                    domain["parkingPosition"] = ParkingPosition(
+                        vehicle=vehicle,
+                        parent=domain,
+                        statusId="parkingPosition",
+                        fromDict=data,
+                    )
+            elif position is not None:
+                position.latitude.enabled = False
+                position.longitude.enabled = False
+                position.enabled = False
+
+    @staticmethod
+    def _classify_error(err: Exception) -> str:
+        """Fehler für Wiederholung und Circuit Breaker einordnen."""
+        from weconnect.errors import (
+            AuthentificationError,
+            RetrievalError,
+            TemporaryAuthentificationError,
+            TooManyRequestsError,
+        )
+
+        if isinstance(err, TooManyRequestsError):
+            # Sofortiges Wiederholen verschärft das Rate-Limit des Backends
+            return ERROR_FAIL
+        if isinstance(
+            err,
+            (TemporaryAuthentificationError, RetrievalError, ConnectionError, TimeoutError),
+        ):
+            return ERROR_RETRY
+        if isinstance(err, AuthentificationError):
+            # Anmeldefehler sind kein Ausfall des Backends
+            return ERROR_IGNORE
+        return ERROR_FAIL
+
+    @callback
+    def _async_count_session_reset(self, reason: str) -> None:
+        """Session verwerfen und den Grund zählen (Diagnose)."""
+        self._weconnect = None
+        self.stats["session_resets"] += 1
+        self.stats[f"session_reset_{reason}"] += 1
+
+    def _build_vehicle_data(self, vin: str, vehicle) -> dict:
+        """Coordinator-Daten für ein WeConnect-Fahrzeug aufbauen."""
+        model = self._safe_attr(vehicle, "model")
+        nickname = self._safe_attr(vehicle, "nickname")
+
+        # Bild-Referenzen speichern, nicht das gesamte Vehicle-Objekt
+        picture_refs = {}
+        try:
+            if hasattr(vehicle, "pictures"):
+                for key in self.picture_types(vin):
+                    if key in vehicle.pictures:
+                        picture_refs[key] = vehicle.pictures[key]
+        except Exception:
+            _LOGGER.debug("Konnte Bild-Referenzen nicht lesen für ***%s", vin[-4:])
+
+        return {
+            "vin": vin,
+            "model": model or "VW Fahrzeug",
+            "nickname": nickname,
+            "picture_refs": picture_refs,
+            "picture_keys": list(picture_refs),
+        }
+
+    async def _async_compose_pictures(self, vehicles: dict) -> None:
+        """Bildtypen lokal aus den Bildebenen zusammensetzen.
+
+        Ebenen kommen aus dem Speicher, dem persistenten Cache oder – einmal
+        je Fahrzeug – von WeConnect. Neu gerendert werden
+        nur Bildtypen, deren Status sich geändert hat; deren Fingerprint
+        steht damit bereits fest. Lässt sich ein Fahrzeug nicht lokal
+        darstellen, lädt weconnect dessen Bilder wie bisher selbst: ohne
+        Basisansicht dauerhaft, nach unerwarteten Fehlern bis zum nächsten
+        Versuch nach REMOTE_PICTURES_RETRY. Vorübergehende Abruffehler
+        lassen den Abruf scheitern und ändern daran nichts.
+        """
+        if self.compositor is None:
+            return
+        from weconnect.errors import AuthentificationError, RetrievalError
+
+        for vin, vehicle_data in vehicles.items():
+            if vin in self._remote_pictures:
+                retry_at = self._remote_pictures[vin]
+                if retry_at is None or time.monotonic() < retry_at:
+                    continue
+                del self._remote_pictures[vin]
+            vehicle = self._weconnect.vehicles[vin]
+            try:
+                if (
+                    not self.compositor.has_layers(vin)
+                    or vin in self._incomplete_layers
+                ):
+                    await self._async_load_layers(vin)
+                rendered, dirty = await self.timings.async_executor_job(
+                    self.hass,
+                    "compose",
+                    self.compositor.render,
+                    vin,
+                    vehicle,
+                    self.picture_types(vin),
+                    pool=self.encode_pool,
+                )
+            except (
+                AuthentificationError,
+                CircuitOpenError,
+                RetrievalError,
+                ConnectionError,
+                TimeoutError,
+            ):
+                raise
+            except Exception as err:
+                _LOGGER.debug(
+                    "Lokale Komposition für ***%s nicht möglich, weconnect lädt die Bilder",
+                    vin[-4:],
+                    exc_info=True,
+                )
+                # Ohne Basisansicht dauerhaft, sonst nur vorübergehend
+                self._remote_pictures[vin] = (
+                    None
+                    if isinstance(err, MissingLayersError)
+                    else time.monotonic() + REMOTE_PICTURES_RETRY
+                )
+                self.compositor.remove(vin)
+                # Badges lädt weconnect nur in Vehicle.update mit Bildern
+                await self.resilience.async_call(
+                    "vehicle_update",
+                    partial(
+                        self.timings.async_executor_job,
+                        self.hass,
+                        "vehicle_update",
+                        partial(vehicle.update, **self._update_kwargs(vin)),
+                        pool=self.network_pool,
+                    ),
+                )
+                vehicle_data.update(self._build_vehicle_data(vin, vehicle))
+                continue
+
+            self.stats["pictures_composed"] += dirty
+            self.stats["pictures_clean"] += len(rendered) - dirty
+            vehicle_data["picture_refs"] = dict(rendered)
+            vehicle_data["picture_keys"] = list(rendered)
+            vehicle_data["fingerprints"] = {
+                key: picture.fingerprint for key, picture in rendered.items()
+            }
+
+    async def _async_load_layers(self, vin: str) -> None:
+        """Bildebenen aus dem persistenten Cache oder von WeConnect laden.
+
+        Scheitern einzelne Ebenen mit einem HTTP-Fehler, wird mit den
+        übrigen gerendert und nur die fehlenden beim nächsten Abruf erneut
+        geladen. Auf die Festplatte kommen nur vollständige Sätze.
+        """
+        from weconnect.errors import RetrievalError
+
+        known, missing = self._incomplete_layers.get(vin, ({}, None))
+        layers = None
+        if missing is None:
+            layers = await self.image_cache.async_get_layers(vin)
+        complete = False
+        if layers is not None:
+            self.stats["layers_from_disk"] += 1
+        else:
+            self.auto_refresh.budget.record()
+            downloaded, failed = await self.resilience.async_call(
+                "layers",
+                partial(
+                    self.timings.async_executor_job,
+                    self.hass,
+                    "layer_download",
+                    download_layers,
+                    self._weconnect,
+                    vin,
+                    missing,
+                    pool=self.network_pool,
+                ),
+            )
+            self.stats["layer_downloads"] += 1
+            _LOGGER.debug(
+                "%d Bildebene(n) für ***%s geladen, %d fehlen",
+                len(downloaded),
+                vin[-4:],
+                len(failed),
+            )
+            layers = {**known, **downloaded}
+            complete = not failed
+            if complete:
+                self._incomplete_layers.pop(vin, None)
+            else:
+                self.stats["layers_incomplete"] += 1
+                self._incomplete_layers[vin] = (layers, failed)
+                if LAYER_CAR not in layers and LAYER_BIRDVIEW not in layers:
+                    # Basisansicht nur vorübergehend nicht abrufbar
+                    raise RetrievalError("Basisansicht der Bildebenen nicht abrufbar")
+
+        images = await self.encode_pool.async_run(decode_layers, layers)
+        self.compositor.set_layers(vin, images)
+        if complete:
+            # Erst nach erfolgreichem Dekodieren für den nächsten Start sichern
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self.image_cache.async_put_layers(vin, layers),
+                name=f"vw_images layers {vin[-4:]}",
+            )
+
+    @callback
+    def async_remove_stale_devices(self) -> None:
+        """Geräte von Fahrzeugen entfernen, die nicht mehr im Account sind.
+
+        Die Entitäten verschwinden mit dem Gerät. Eine leere Fahrzeugliste
+        gilt als Störung und entfernt nichts.
+        """
+        if not self.data:
+            return
+        entry_id = self.config_entry.entry_id
+        device_registry = dr.async_get(self.hass)
+        for device in dr.async_entries_for_config_entry(device_registry, entry_id):
+            vins = {
+                identifier
+                for domain, identifier in device.identifiers
+                if domain == DOMAIN
+            }
+            # Dienst-Gerät des Accounts (Diagnose-Sensoren) bleibt
+            if not vins or entry_id in vins or vins & self.data.keys():
+                continue
+            _LOGGER.info(
+                "Fahrzeug ***%s nicht mehr im Account, entferne Gerät",
+                next(iter(vins))[-4:],
+            )
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry_id
+            )
+            self.stats["devices_removed"] += 1
+
+    async def _async_encode_changed(self, vehicles: dict) -> None:
+        """Alle geänderten Bilder in einem Durchlauf kodieren.
+
+        Bilder, deren Fingerprint bereits im Store liegt, werden übersprungen
+        (beim statischen Export nur, wenn sie auch schon exportiert sind).
+        Die Bilder werden einzeln auf die Threads des Encode-Pools verteilt;
+        Pillow gibt beim Kodieren den GIL frei, dadurch laufen große
+        PNG-Encodes auch ohne Prozess-Pool auf mehreren Kernen.
+        """
+        start = time.monotonic()
+        jobs = {}
+        for vin, vehicle_data in vehicles.items():
+            fingerprints = vehicle_data.get("fingerprints", {})
+            for key, pictures_ref in vehicle_data["picture_refs"].items():
+                fingerprint = fingerprints.get(key)
+                version = self._picture_versions.get((vin, key))
+                if version is None or version[1] != fingerprint:
+                    generation = version[0] if version is not None else 0
+                    self._picture_versions[(vin, key)] = (generation + 1, fingerprint)
+                if fingerprint is not None and fingerprint in (
+                    getattr(self.image_store.peek(vin, key), "fingerprint", None),
+                    self.image_cache.get_fingerprint(
+                        vin, key, variant=self.encode_settings.variant
+                    ),
+                ) and (
+                    self.exporter is None
+                    or self.exporter.is_current(
+                        vin,
+                        key,
+                        fingerprint,
+                        self.encode_settings.variant,
+                        self.encode_settings.renditions,
+                    )
+                ):
+                    # Unverändert: liegt im Store oder im persistenten Cache
+                    self.stats["encode_skipped"] += 1
+                    continue
+                jobs[(vin, key)] = pictures_ref
+        if not jobs:
+            return
+
+        settings = self.encode_settings
+        try:
+            images = await self.timings.async_executor_job(
+                self.hass,
+                "extract",
+                self._load_pictures,
+                jobs,
+                pool=self.encode_pool,
+            )
+            # Laufzeit je Bild meldet encode_renditions selbst; Pillow gibt
+            # beim Kodieren den GIL frei, mehrere Encode-Threads nutzen also
+            # mehrere Kerne
+            pending = (
+                self.timings.async_executor_job(
+                    self.hass,
+                    None,
+                    encode_renditions,
+                    pil_image,
+                    settings,
+                    pool=self.encode_pool,
+                )
+                for pil_image in images.values()
+            )
+            encoded = await asyncio.gather(*pending, return_exceptions=True)
+        except Exception:
+            _LOGGER.warning("Kodierung der Fahrzeugbilder fehlgeschlagen", exc_info=True)
+            return
+
+        results = {}
+        exports = []
+        for (vin, key), renditions in zip(images, encoded):
+            if isinstance(renditions, BaseException):
+                # Einzelne Fehler brechen den Durchlauf nicht ab
+                _LOGGER.debug(
+                    "Kodierung fehlgeschlagen für %s (***%s)",
+                    key,
+                    vin[-4:],
+                    exc_info=renditions,
+                )
+                continue
+            results[(vin, key)] = renditions
+
+        for (vin, key), renditions in results.items():
+            fingerprint = vehicles[vin].get("fingerprints", {}).get(key)
+            self.stats["pictures_encoded"] += 1
+            self.timings.record(
+                f"encode_{key}",
+                sum(encode_time for _, encode_time in renditions.values()),
+            )
+            for rendition, (image_bytes, encode_time) in renditions.items():
+                if image_bytes is None:
+                    continue
+                stored = self.image_store.put(
+                    vin, key, rendition, fingerprint, image_bytes, encode_time
+                )
+                exports.append((vin, key, rendition, fingerprint, stored))
+                self.stats["images_encoded"] += 1
+                self.config_entry.async_create_background_task(
+                    self.hass,
+                    self.image_cache.async_put_image(
+                        vin, key, rendition, fingerprint, settings.variant, image_bytes
+                    ),
+                    name=f"vw_images cache {key} {rendition}",
+                )
+
+        if self.exporter is not None and exports:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self.exporter.async_export(
+                    exports, settings.image_format, settings.variant
+                ),
+                name="vw_images export",
+            )
+
+        self.last_encode_duration = time.monotonic() - start
+        self.timings.record("encode_batch", self.last_encode_duration)
+        _LOGGER.debug(
+            "%d Bild(er) als %s in %.3f s kodiert (%d Byte)",
+            len(results),
+            settings.variant,
+            self.last_encode_duration,
+            sum(
+                len(image_bytes)
+                for renditions in results.values()
+                for image_bytes, _ in renditions.values()
+                if image_bytes is not None
+            ),
+        )
+
+    def picture_version(self, vin: str, picture_key: str) -> tuple[int, str | None]:
+        """Generation und Fingerprint des aktuellen Bilds.
+
+        Vor dem ersten Live-Abruf (Schnellstart) gilt Generation 0 mit dem
+        Fingerprint aus dem Cache-Snapshot.
+        """
+        version = self._picture_versions.get((vin, picture_key))
+        if version is not None:
+            return version
+        vehicle_data = (self.data or {}).get(vin, {})
+        return 0, vehicle_data.get("fingerprints", {}).get(picture_key)
+
+    def put_image_if_current(
+        self,
+        vin: str,
+        picture_key: str,
+        rendition: str,
+        version: tuple[int, str | None],
+        image_bytes: bytes,
+        encode_time: float = 0.0,
+    ) -> StoredImage:
+        """Bei Bedarf kodiertes Bild ablegen, sofern es noch aktuell ist.
+
+        Ein verspäteter Job einer älteren Generation überschreibt kein
+        neueres Bild; der Aufrufer erhält sein Ergebnis trotzdem.
+        """
+        generation, fingerprint = version
+        if self.picture_version(vin, picture_key)[0] != generation:
+            self.stats["encode_stale"] += 1
+            return StoredImage(fingerprint, image_bytes, encode_time)
+        return self.image_store.put(
+            vin, picture_key, rendition, fingerprint, image_bytes, encode_time
+        )
+
+    @staticmethod
+    def _load_pictures(jobs: dict) -> dict:
+        """PIL-Bilder aus den WeConnect-Referenzen lesen (blocking)."""
+        images = {}
+        for key, pictures_ref in jobs.items():
+            pil_image = pictures_ref.value
+            if pil_image is not None:
+                images[key] = pil_image
+        return images
+
+    def get_picture_ref(self, vin: str, picture_key: str):
+        """Aktuelle Bildreferenz (zum erneuten Kodieren bei Bedarf).
+
+        Lokal zusammengesetzte Bilder haben Vorrang vor denen von weconnect.
+        """
+        if self.compositor is not None and vin not in self._remote_pictures:
+            picture = self.compositor.get(vin, picture_key)
+            if picture is not None:
+                return picture
+        if self._weconnect is None:
+            return None
+        try:
+            vehicle = self._weconnect.vehicles.get(vin)
+            if vehicle is None or not hasattr(vehicle, "pictures"):
+                return None
+            return vehicle.pictures.get(picture_key)
+        except Exception:
+            return None
+
+    @property
+    def composition_state(self) -> dict:
+        """Zustand der lokalen Komposition für die Diagnose."""
+        return {
+            "enabled": self.compositor is not None,
+            "composed_vehicles": len(self.compositor.vehicles)
+            if self.compositor is not None
+            else 0,
+            "remote_vehicles": len(self._remote_pictures),
+            "incomplete_vehicles": len(self._incomplete_layers),
+        }
+
+    def seconds_until_allowed(self, vin: str | None = None) -> float:
+        """Restzeit bis zum nächsten erlaubten Abruf (vollständig oder je VIN).
+
+        Berücksichtigt das Rate-Limit-Fenster und einen offenen Circuit
+        Breaker – Anfragen in der Sperre holt der Scheduler danach nach.
+        """
+        breaker_remaining = self.resilience.breaker.remaining
+        last = self._last_refresh_time
+        if vin is not None:
+            last = max(last, self._last_vehicle_refresh.get(vin, 0))
+        if last <= 0:
+            return breaker_remaining
+        return max(
+            MIN_REFRESH_INTERVAL - (time.monotonic() - last), breaker_remaining
+        )
+
+    async def async_refresh_vehicle(self, vin: str) -> bool:
+        """Nur ein Fahrzeug aktualisieren und dessen Entitäten benachrichtigen.
+
+        Ohne bestehende Session oder bei unbekannter VIN wird auf einen
+        vollständigen Refresh zurückgefallen (Login + Fahrzeugliste).
+        Gibt zurück, ob der Abruf erfolgreich war.
+        """
+        vehicle = (
+            self._weconnect.vehicles.get(vin) if self._weconnect is not None else None
+        )
+        if vehicle is None or self.data is None:
+            await self.async_refresh()
+            return self.last_update_success
+
+        async with self._update_lock:
+            return await self._async_refresh_vehicle(vin, vehicle)
+
+    async def _async_refresh_vehicle(self, vin: str, vehicle) -> bool:
+        """Ein Fahrzeug abrufen und verarbeiten (unter _update_lock)."""
+        _LOGGER.debug("Aktualisiere WeConnect Daten für ***%s", vin[-4:])
+        self.auto_refresh.budget.record()
+        try:
+            # Ohne fromDict: nur Status und Bilder dieses Fahrzeugs laden
+            await self.resilience.async_call(
+                "vehicle_update",
+                partial(
+                    self.timings.async_executor_job,
+                    self.hass,
+                    "vehicle_update",
+                    partial(vehicle.update, **self._update_kwargs(vin)),
+                    pool=self.network_pool,
+                ),
+            )
+            await self._async_fetch_parking_positions({vin: vehicle})
+            self._last_vehicle_refresh[vin] = time.monotonic()
+            await self.network_pool.async_run(self._persist_tokens, self._weconnect)
+
+            vehicle_data = self._build_vehicle_data(vin, vehicle)
+            await self._async_compose_pictures({vin: vehicle_data})
+            await self.timings.async_executor_job(
+                self.hass,
+                "fingerprint",
+                self._compute_fingerprints,
+                {vin: vehicle_data},
+                pool=self.encode_pool,
+            )
+            await self._async_encode_changed({vin: vehicle_data})
+            self._async_release_pictures(vin, vehicle_data)
+        except CircuitOpenError as err:
+            _LOGGER.debug("Update für ***%s übersprungen: %s", vin[-4:], err)
+            return False
+        except Exception:
+            _LOGGER.warning(
+                "WeConnect Update für ***%s fehlgeschlagen", vin[-4:], exc_info=True
+            )
+            return False
+
+        self.data = {**self.data, vin: vehicle_data}
+        await self.image_cache.async_update_vehicles(
+            self.data, {vin: self.picture_types(vin) for vin in self.data}
+        )
+
+        # Alle Listener benachrichtigen: neue Bildtypen werden entdeckt und
+        # die automatische Aktualisierung sieht die Aktivität; Entitäten
+        # anderer Fahrzeuge bleiben unverändert (gleicher Fingerprint)
+        self.async_update_listeners()
+        return True
+
+    @callback
+    def async_set_cached_data(self) -> bool:
+        """Daten aus dem persistenten Cache übernehmen (Schnellstart).
+
+        Liefert False, wenn noch kein Snapshot existiert. Die Bild-Referenzen
+        bleiben leer, bis der erste Live-Abruf abgeschlossen ist.
+        """
+        snapshot = self.image_cache.vehicles
+        if not snapshot:
+            return False
+
+        vehicles = {}
+        for vin, meta in snapshot.items():
+            picture_keys = [
+                key
+                for key in meta.get("picture_keys", [])
+                if key in self.picture_types(vin)
+            ]
+            vehicles[vin] = {
+                "vin": vin,
+                "model": meta.get("model") or "VW Fahrzeug",
+                "nickname": meta.get("nickname"),
+                "picture_keys": picture_keys,
+                "fingerprints": {
+                    key: fingerprint
+                    for key in picture_keys
+                    if (
+                        fingerprint := self.image_cache.get_fingerprint(
+                            vin, key, variant=self.encode_settings.variant
+                        )
+                    )
+                },
+            }
+        self.async_set_updated_data(vehicles)
+        return True
+
+    async def async_background_first_refresh(self) -> None:
+        """Login und ersten Abruf im Hintergrund durchführen (Schnellstart)."""
+        start = time.monotonic()
+        await self.scheduler.async_request()
+        duration = time.monotonic() - start
+        self.timings.record("setup_background_refresh", duration)
+        _LOGGER.info(
+            "Erster Live-Abruf im Hintergrund %s nach %.2f s",
+            "abgeschlossen" if self.last_update_success else "fehlgeschlagen",
+            duration,
+        )
+
+    def async_cleanup(self) -> None:
+        """Scheduler stoppen und WeConnect-Session verwerfen.
+
+        weconnect kennt kein Logout; die Tokens bleiben für den nächsten
+        Start gespeichert.
+        """
+        self.auto_refresh.async_shutdown()
+        self.scheduler.async_shutdown()
+        self.network_pool.shutdown()
+        self.encode_pool.shutdown()
+        self.hass.data[DATA_IMAGE_STORE].remove_entry(self.config_entry.entry_id)
+        self._weconnect = None
+
+    @staticmethod
+    def _compute_fingerprints(vehicles: dict) -> None:
+        """Inhalts-Hash je Bildtyp aus dem Pixel-Puffer berechnen.
+
+        Ergebnis landet unter vehicles[vin]["fingerprints"][picture_key].
+        Gleicher Fingerprint bedeutet identische Pixel – das Bild muss
+        weder neu kodiert noch von Dashboards neu geladen werden. Lokal
+        zusammengesetzte Bilder bringen ihren Fingerprint bereits mit.
+        """
+        for vin, vehicle_data in vehicles.items():
+            fingerprints = vehicle_data.setdefault("fingerprints", {})
+            for key, pictures_ref in vehicle_data["picture_refs"].items():
+                if key in fingerprints:
+                    continue
+                try:
+                    pil_image = pictures_ref.value
+                    if pil_image is None:
+                        continue
+                    fingerprints[key] = image_fingerprint(pil_image)
+                except Exception:
+                    _LOGGER.debug(
+                        "Fingerprint für %s (***%s) nicht berechenbar", key, vin[-4:]
+                    )
 
     @staticmethod
     def _safe_attr(obj, attr: str) -> str | None:
@@ -0,0 +1,87 @@
+"""Diagnose-Daten für die VW Images Integration."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_VEHICLE_PICTURE_TYPES, DATA_IMAGE_STORE, DOMAIN
+from .coordinator import VWImagesCoordinator
+from .imports import import_durations
+from .metrics import hit_rate
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Diagnose eines Accounts: Zeiten je Phase, Cache und Rate-Limit."""
+    coordinator: VWImagesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    stats = coordinator.stats
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": {
+                **entry.options,
+                # VINs wie bei den Fahrzeugen nur gekürzt ausgeben
+                CONF_VEHICLE_PICTURE_TYPES: {
+                    f"***{vin[-4:]}": picture_types
+                    for vin, picture_types in entry.options.get(
+                        CONF_VEHICLE_PICTURE_TYPES, {}
+                    ).items()
+                },
+            },
+        },
+        "last_update_success": coordinator.last_update_success,
+        "encode_settings": {
+            "variant": coordinator.encode_settings.variant,
+            "renditions": list(coordinator.encode_settings.renditions),
+        },
+        # Login/Abruf = VW-Cloud, executor_wait = Executor, encode_* = Kodierung,
+        # setup_* = Phasen des Setups, import_wait = Warten auf weconnect/PIL
+        "timings": coordinator.timings.as_dict(),
+        "imports_ms": {
+            module: round(duration * 1000, 1)
+            for module, duration in (import_durations(hass) or {}).items()
+        },
+        "counters": dict(stats),
+        "cache_hit_rates": {
+            "memory": hit_rate(
+                stats["store_hit"], stats["disk_cache_hit"] + stats["encode_on_demand"]
+            ),
+            "disk": hit_rate(stats["disk_cache_hit"], stats["encode_on_demand"]),
+            "fingerprint": hit_rate(
+                stats["encode_skipped"], stats["pictures_encoded"]
+            ),
+            "http_not_modified": hit_rate(
+                stats["http_not_modified"], stats["http_full_response"]
+            ),
+        },
+        "circuit_breaker": coordinator.resilience.breaker.as_dict(),
+        "worker_pools": {
+            pool.name: pool.state
+            for pool in (coordinator.network_pool, coordinator.encode_pool)
+        },
+        "composition": coordinator.composition_state,
+        "scheduler": coordinator.scheduler.state,
+        "auto_refresh": coordinator.auto_refresh.state,
+        "image_store": hass.data[DATA_IMAGE_STORE].state,
+        "static_export": coordinator.exporter.state
+        if coordinator.exporter is not None
+        else None,
+        "disk_cache": {
+            "bytes": coordinator.image_cache.total_bytes,
+            "vehicles": len(coordinator.image_cache.vehicles),
+        },
+        "vehicles": {
+            f"***{vin[-4:]}": {
+                "model": vehicle_data.get("model"),
+                "picture_types": list(coordinator.picture_types(vin)),
+                "picture_keys": vehicle_data.get("picture_keys", []),
+                "fingerprints": vehicle_data.get("fingerprints", {}),
+            }
+            for vin, vehicle_data in (coordinator.data or {}).items()
+        },
+    }
@@ -0,0 +1,104 @@
+"""Bild-Encoding für die VW Images Integration.
+
+Reine Funktionen ohne Zugriff auf Home Assistant, damit sie in den
+Threads des Encode-Pools ausgeführt werden können.
+"""
+
+import hashlib
+import io
+import logging
+import time
+from dataclasses import dataclass
+
+from .const import (
+    CONTENT_TYPES,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_IMAGE_QUALITY,
+    MAX_IMAGE_PIXELS,
+    RENDITION_FULL,
+    RENDITION_SIZES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EncodeSettings:
+    """Ausgabeformat, Qualität und gewünschte Renditionen."""
+
+    image_format: str = DEFAULT_IMAGE_FORMAT
+    quality: int = DEFAULT_IMAGE_QUALITY
+    renditions: tuple[str, ...] = (RENDITION_FULL,)
+
+    @property
+    def content_type(self) -> str:
+        """MIME-Typ des Ausgabeformats."""
+        return CONTENT_TYPES[self.image_format]
+
+    @property
+    def variant(self) -> str:
+        """Kennung von Format und Qualität (für Cache-Vergleiche)."""
+        if self.image_format == "png":
+            return "png"
+        return f"{self.image_format}-q{self.quality}"
+
+
+def image_fingerprint(pil_image) -> str:
+    """Inhalts-Hash eines PIL-Bilds aus Modus, Größe und Pixel-Puffer."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{pil_image.mode}:{pil_image.size}".encode())
+    digest.update(pil_image.tobytes())
+    return digest.hexdigest()
+
+
+def encode_image(
+    pil_image, settings: EncodeSettings = EncodeSettings(), rendition: str = RENDITION_FULL
+) -> bytes | None:
+    """PIL-Bild kodieren (None bei zu großen Bildern).
+
+    Renditionen außer "full" werden vorher auf ihre Maximalkante verkleinert.
+    """
+    from PIL import Image
+
+    # Größenprüfung gegen Decompression-Bombs
+    width, height = pil_image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        _LOGGER.warning(
+            "Bild zu groß (%dx%d), überspringe",
+            width, height,
+        )
+        return None
+
+    max_size = RENDITION_SIZES[rendition]
+    if max_size is not None and max(width, height) > max_size:
+        pil_image = pil_image.copy()
+        pil_image.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    if settings.image_format == "jpeg":
+        # JPEG kennt keine Transparenz → auf weißen Hintergrund legen
+        rgba = pil_image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        background.save(buf, format="JPEG", quality=settings.quality, optimize=True)
+    elif settings.image_format == "webp":
+        pil_image.save(buf, format="WEBP", quality=settings.quality, method=4)
+    else:
+        pil_image.save(buf, format="PNG")
+    image_bytes = buf.getvalue()
+    buf.close()
+    return image_bytes
+
+
+def encode_renditions(pil_image, settings: EncodeSettings) -> dict:
+    """Alle Renditionen eines Bilds kodieren.
+
+    Liefert je Rendition ein Tupel (Bytes oder None, Encode-Zeit in Sekunden).
+    """
+    results = {}
+    for rendition in settings.renditions:
+        start = time.perf_counter()
+        image_bytes = encode_image(pil_image, settings, rendition)
+        results[rendition] = (image_bytes, time.perf_counter() - start)
+    return results
+
@@ -0,0 +1,272 @@
+"""Export der Fahrzeugbilder als statische Dateien (optional).
+
+Jede geänderte Rendition wird atomar nach <Verzeichnis>/<vin>/ geschrieben,
+z. B. www/vw_images/<vin>/statusWithBadge.png. Daneben liegt je Fahrzeug
+ein manifest.json mit Inhalts-Hash, Größe und Zeitstempel jeder Datei.
+Kiosk-Displays und externe Dashboards laden die Dateien dann direkt vom
+Webserver (unter www/ als /local/...) mit normalem HTTP-Caching.
+
+Geschrieben wird nur, wenn sich der Inhalt geändert hat.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+
+from homeassistant.core import HomeAssistant
+
+from .const import RENDITION_FULL
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Dateiendung je Ausgabeformat
+FILE_EXTENSIONS = {
+    "png": "png",
+    "webp": "webp",
+    "jpeg": "jpg",
+}
+
+
+def export_filename(picture_key: str, rendition: str, image_format: str) -> str:
+    """Dateiname einer Rendition (Originalgröße ohne Suffix)."""
+    extension = FILE_EXTENSIONS[image_format]
+    if rendition == RENDITION_FULL:
+        return f"{picture_key}.{extension}"
+    return f"{picture_key}_{rendition}.{extension}"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Datei über eine temporäre Datei ersetzen (Leser sehen nie halbe Bilder)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class StaticExporter:
+    """Schreibt die Bilder eines Accounts in ein Verzeichnis.
+
+    Die Manifeste tragen die Entry-ID, damit mehrere Accounts dasselbe
+    Verzeichnis nutzen können und nur eigene Fahrzeuge aufgeräumt werden.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, directory: str) -> None:
+        """Initialisiere den Export (Verzeichnis relativ zum Config-Ordner)."""
+        self.hass = hass
+        self._entry_id = entry_id
+        self.directory = hass.config.path(directory)
+        self._manifests: dict[str, dict] = {}
+        self.stats: Counter[str] = Counter()
+        # Aufeinanderfolgende Exporte dürfen sich die Manifeste nicht überschreiben
+        self._lock = asyncio.Lock()
+
+    @property
+    def state(self) -> dict:
+        """Zustand für die Diagnose."""
+        return {
+            "directory": self.directory,
+            "vehicles": len(self._manifests),
+            **self.stats,
+        }
+
+    def _vehicle_directory(self, vin: str) -> str:
+        return os.path.join(self.directory, vin)
+
+    async def async_load(self) -> None:
+        """Vorhandene Manifeste dieses Accounts lesen."""
+
+        def _load() -> dict[str, dict]:
+            manifests = {}
+            try:
+                vins = os.listdir(self.directory)
+            except OSError:
+                return manifests
+            for vin in vins:
+                path = os.path.join(self.directory, vin, MANIFEST_FILE)
+                try:
+                    with open(path, encoding="utf-8") as file:
+                        manifest = json.load(file)
+                except (OSError, ValueError):
+                    continue
+                if manifest.get("entry_id") == self._entry_id:
+                    manifests[vin] = manifest
+            return manifests
+
+        self._manifests = await self.hass.async_add_executor_job(_load)
+
+    def is_current(
+        self, vin: str, picture_key: str, fingerprint: str | None, variant: str, renditions
+    ) -> bool:
+        """Ob alle Renditionen eines Bilds in diesem Stand exportiert sind."""
+        meta = self._manifests.get(vin, {}).get("images", {}).get(picture_key)
+        return (
+            meta is not None
+            and fingerprint is not None
+            and meta["fingerprint"] == fingerprint
+            and meta["variant"] == variant
+            and set(renditions) <= meta["files"].keys()
+        )
+
+    async def async_export(self, images: list[tuple], image_format: str, variant: str) -> None:
+        """Geänderte Renditionen schreiben und Manifeste aktualisieren.
+
+        images: (vin, picture_key, rendition, fingerprint, StoredImage).
+        Ein Executor-Job je Aufruf (ein Durchlauf des Coordinators).
+        """
+        async with self._lock:
+            await self._async_export(images, image_format, variant)
+
+    async def _async_export(self, images: list[tuple], image_format: str, variant: str) -> None:
+        now = time.time()
+        changed: dict[str, dict] = {}
+        dirty: set[str] = set()
+        writes: list[tuple[str, bytes]] = []
+        removes: list[str] = []
+        for vin, picture_key, rendition, fingerprint, stored in images:
+            manifest = changed.get(vin) or self._copy_manifest(vin)
+            changed[vin] = manifest
+            meta = manifest["images"].get(picture_key)
+            if meta is None or meta["variant"] != variant:
+                if meta is not None:
+                    # Format gewechselt: Dateien mit alter Endung entfernen
+                    removes.extend(
+                        os.path.join(self._vehicle_directory(vin), file["file"])
+                        for file in meta["files"].values()
+                    )
+                meta = manifest["images"][picture_key] = {
+                    "variant": variant,
+                    "files": {},
+                }
+            if meta.get("fingerprint") != fingerprint:
+                meta["fingerprint"] = fingerprint
+                dirty.add(vin)
+            filename = export_filename(picture_key, rendition, image_format)
+            current = meta["files"].get(rendition)
+            if current is not None and current["hash"] == stored.version:
+                self.stats["files_unchanged"] += 1
+                continue
+            meta["files"][rendition] = {
+                "file": filename,
+                "hash": stored.version,
+                "bytes": len(stored.data),
+                "updated": now,
+            }
+            manifest["updated"] = now
+            dirty.add(vin)
+            writes.append((os.path.join(self._vehicle_directory(vin), filename), stored.data))
+
+        def _write() -> None:
+            for vin in dirty:
+                os.makedirs(self._vehicle_directory(vin), exist_ok=True)
+            for path, data in writes:
+                _write_atomic(path, data)
+            for path in removes:
+                if not any(path == written for written, _ in writes):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            # Manifest zuletzt: verweist nur auf vollständig geschriebene Dateien
+            for vin in dirty:
+                _write_atomic(
+                    os.path.join(self._vehicle_directory(vin), MANIFEST_FILE),
+                    json.dumps(changed[vin], indent=2, sort_keys=True).encode(),
+                )
+
+        if not dirty:
+            return
+        try:
+            await self.hass.async_add_executor_job(_write)
+        except OSError:
+            _LOGGER.warning(
+                "Bilder konnten nicht nach %s exportiert werden",
+                self.directory,
+                exc_info=True,
+            )
+            return
+        self._manifests.update({vin: changed[vin] for vin in dirty})
+        self.stats["files_written"] += len(writes)
+        _LOGGER.debug("%d Datei(en) nach %s exportiert", len(writes), self.directory)
+
+    def _copy_manifest(self, vin: str) -> dict:
+        """Arbeitskopie des Manifests (übernommen erst nach dem Schreiben)."""
+        manifest = self._manifests.get(vin)
+        if manifest is None:
+            return {
+                "version": MANIFEST_VERSION,
+                "entry_id": self._entry_id,
+                "vin": vin,
+                "updated": None,
+                "images": {},
+            }
+        return {
+            **manifest,
+            "images": {
+                key: {**meta, "files": dict(meta["files"])}
+                for key, meta in manifest["images"].items()
+            },
+        }
+
+    async def async_remove_stale(self, selection: dict[str, tuple[str, ...]]) -> None:
+        """Exporte verschwundener Fahrzeuge und abgewählter Bildtypen entfernen.
+
+        selection: VIN → gewählte Bildtypen.
+        """
+        stale = [vin for vin in self._manifests if vin not in selection]
+        deselected = {
+            vin: [key for key in manifest["images"] if key not in selection[vin]]
+            for vin, manifest in self._manifests.items()
+            if vin in selection
+        }
+        deselected = {vin: keys for vin, keys in deselected.items() if keys}
+        if not stale and not deselected:
+            return
+        async with self._lock:
+            for vin in stale:
+                self._manifests.pop(vin, None)
+                await self.hass.async_add_executor_job(
+                    shutil.rmtree, self._vehicle_directory(vin), True
+                )
+            for vin, keys in deselected.items():
+                manifest = self._copy_manifest(vin)
+                paths = [
+                    os.path.join(self._vehicle_directory(vin), file["file"])
+                    for key in keys
+                    for file in manifest["images"].pop(key)["files"].values()
+                ]
+                manifest["updated"] = time.time()
+
+                def _remove(vin=vin, manifest=manifest, paths=paths) -> None:
+                    # Manifest zuerst: verweist nie auf gelöschte Dateien
+                    _write_atomic(
+                        os.path.join(self._vehicle_directory(vin), MANIFEST_FILE),
+                        json.dumps(manifest, indent=2, sort_keys=True).encode(),
+                    )
+                    for path in paths:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+
+                try:
+                    await self.hass.async_add_executor_job(_remove)
+                except OSError:
+                    _LOGGER.warning(
+                        "Export in %s konnte nicht bereinigt werden",
+                        self.directory,
+                        exc_info=True,
+                    )
+                    continue
+                self._manifests[vin] = manifest
+        _LOGGER.debug(
+            "Export bereinigt: %d Fahrzeug(e), %d Fahrzeug(e) mit abgewählten Bildtypen",
+            len(stale),
+            len(deselected),
+        )
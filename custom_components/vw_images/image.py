@@ -1,17 +1,20 @@
 """Image-Entitäten für die VW Images Integration."""
 
-import io
+import asyncio
 import logging
 from datetime import datetime
 
 from homeassistant.components.image import ImageEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MAX_IMAGE_PIXELS
+from .const import DOMAIN, RENDITION_FULL
 from .coordinator import VWImagesCoordinator
+from .encoder import encode_image
+from .image_store import StoredImage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,26 +44,72 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Image-Entitäten aus Config-Entry einrichten."""
+    """Image-Entitäten aus Config-Entry einrichten.
+
+    Nach jedem Abruf werden Entitäten für neue Fahrzeuge und neu
+    verfügbare Bildtypen ergänzt, ohne den Config-Entry neu zu laden;
+    Entitäten abgewählter Bildtypen werden entfernt.
+    """
     coordinator: VWImagesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    known: dict[tuple[str, str], VehicleImageEntity] = {}
 
-    entities = []
-    for vin, vehicle_data in coordinator.data.items():
-        picture_refs = vehicle_data.get("picture_refs", {})
-        for picture_key, config in PICTURE_TYPES.items():
-            if picture_key in picture_refs:
-                entities.append(
-                    VehicleImageEntity(
-                        coordinator,
-                        vin,
-                        vehicle_data,
-                        picture_key=picture_key,
-                        entity_name=config["name"],
-                        unique_suffix=config["suffix"],
-                    )
+    @callback
+    def _async_add_new_entities() -> None:
+        data = coordinator.data or {}
+        if data:
+            # Verschwundene Fahrzeuge vergessen (ihr Gerät entfernt der
+            # Coordinator), damit sie bei der Rückkehr neu angelegt werden
+            for key in [key for key in known if key[0] not in data]:
+                del known[key]
+        _async_remove_deselected(hass, coordinator, known)
+
+        entities = []
+        for vin, vehicle_data in data.items():
+            picture_keys = vehicle_data.get("picture_keys", [])
+            for picture_key, config in PICTURE_TYPES.items():
+                if picture_key not in picture_keys or (vin, picture_key) in known:
+                    continue
+                entity = known[(vin, picture_key)] = VehicleImageEntity(
+                    coordinator,
+                    vin,
+                    vehicle_data,
+                    picture_key=picture_key,
+                    entity_name=config["name"],
+                    unique_suffix=config["suffix"],
                 )
+                entities.append(entity)
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_entities))
 
-    async_add_entities(entities)
+
+@callback
+def _async_remove_deselected(
+    hass: HomeAssistant,
+    coordinator: VWImagesCoordinator,
+    known: dict[tuple[str, str], "VehicleImageEntity"],
+) -> None:
+    """Entitäten abgewählter Bildtypen samt Registry-Eintrag entfernen.
+
+    Erfasst auch Registry-Einträge aus der Zeit vor einem Neustart, für
+    die keine Entität mehr angelegt wurde.
+    """
+    registry = er.async_get(hass)
+    for vin in coordinator.data or {}:
+        selected = coordinator.picture_types(vin)
+        for picture_key, config in PICTURE_TYPES.items():
+            if picture_key in selected:
+                continue
+            entity = known.pop((vin, picture_key), None)
+            entity_id = registry.async_get_entity_id(
+                "image", DOMAIN, f"{DOMAIN}_{vin}_{config['suffix']}"
+            )
+            if entity_id is not None:
+                registry.async_remove(entity_id)
+            elif entity is not None:
+                hass.async_create_task(entity.async_remove(force_remove=True))
 
 
 class VehicleImageEntity(CoordinatorEntity[VWImagesCoordinator], ImageEntity):
@@ -85,8 +134,13 @@ class VehicleImageEntity(CoordinatorEntity[VWImagesCoordinator], ImageEntity):
         self._picture_key = picture_key
         self._attr_unique_id = f"{DOMAIN}_{vin}_{unique_suffix}"
         self._attr_name = entity_name
-        self._attr_image_last_updated = None
-        self._cached_image_bytes: bytes | None = None
+        self._fingerprint: str | None = vehicle_data.get("fingerprints", {}).get(
+            picture_key
+        )
+        self._attr_image_last_updated = datetime.now() if self._fingerprint else None
+        # Laufende Lade-/Kodierjobs je (Rendition, Generation): gleichzeitige
+        # Aufrufer warten auf denselben Job statt selbst zu kodieren
+        self._in_flight: dict[tuple[str, int], asyncio.Task] = {}
 
         # Device-Info: Gruppiert alle Entitäten eines Fahrzeugs
         display_name = vehicle_data.get("nickname") or vehicle_data.get("model", "VW")
@@ -97,56 +151,139 @@ class VehicleImageEntity(CoordinatorEntity[VWImagesCoordinator], ImageEntity):
             "model": vehicle_data.get("model"),
         }
 
+    def _current_fingerprint(self) -> str | None:
+        """Aktueller Inhalts-Hash des Bilds laut Coordinator-Daten."""
+        if self.coordinator.data is None:
+            return None
+        vehicle_data = self.coordinator.data.get(self._vin)
+        if vehicle_data is None:
+            return None
+        return vehicle_data.get("fingerprints", {}).get(self._picture_key)
+
+    @property
+    def available(self) -> bool:
+        """Verfügbar, solange Live-Daten oder ein gecachtes Bild existieren."""
+        return super().available or (
+            self.coordinator.image_cache.get_fingerprint(
+                self._vin,
+                self._picture_key,
+                variant=self.coordinator.encode_settings.variant,
+            )
+            is not None
+        )
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Reagiere auf Coordinator-Updates: Cache invalidieren, Zeitstempel setzen."""
-        self._cached_image_bytes = None
-        self._attr_image_last_updated = datetime.now()
+        """Reagiere auf Coordinator-Updates.
+
+        Der Zeitstempel wird nur angefasst, wenn sich die Pixel
+        tatsächlich geändert haben – sonst laden Dashboards nichts neu.
+        Fehlt der Fingerprint weiterhin (z. B. noch kein Bild), gilt das
+        ebenfalls als unverändert.
+        """
+        fingerprint = self._current_fingerprint()
+        if fingerprint == self._fingerprint:
+            self.coordinator.stats["image_unchanged"] += 1
+            _LOGGER.debug(
+                "Bild %s für ***%s unverändert", self._picture_key, self._vin[-4:]
+            )
+        else:
+            self.coordinator.stats["image_changed"] += 1
+            self._fingerprint = fingerprint
+            self._attr_image_last_updated = datetime.now()
         super()._handle_coordinator_update()
 
     async def async_image(self) -> bytes | None:
-        """Liefere das Fahrzeugbild als PNG-Bytes (mit Caching)."""
-        if self._cached_image_bytes is not None:
-            return self._cached_image_bytes
+        """Liefere das Fahrzeugbild in Originalgröße."""
+        stored = await self.async_rendition(RENDITION_FULL)
+        return stored.data if stored is not None else None
+
+    async def async_rendition(self, rendition: str) -> StoredImage | None:
+        """Liefere eine Rendition des Fahrzeugbilds im konfigurierten Format.
 
+        Der Coordinator kodiert geänderte Bilder direkt nach jedem Refresh;
+        hier werden im Normalfall nur fertige Bytes aus dem Store gelesen.
+        Fehlt ein Bild, lädt bzw. kodiert es genau ein Job, auf den alle
+        gleichzeitigen Aufrufer warten.
+        """
+        settings = self.coordinator.encode_settings
+        if rendition not in settings.renditions:
+            return None
+
+        stored = self.coordinator.image_store.get(self._vin, self._picture_key, rendition)
+        if stored is not None:
+            self.coordinator.stats["store_hit"] += 1
+            return stored
+
+        version = self.coordinator.picture_version(self._vin, self._picture_key)
+        flight_key = (rendition, version[0])
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            task = self.hass.async_create_task(
+                self._async_load_rendition(rendition, version),
+                f"vw_images load {self._picture_key} {rendition}",
+            )
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda _task: self._in_flight.pop(flight_key, None))
+        else:
+            self.coordinator.stats["encode_joined"] += 1
+        # Bricht ein Aufrufer ab (z. B. Browser geschlossen), läuft der Job
+        # für die übrigen weiter
+        return await asyncio.shield(task)
+
+    async def _async_load_rendition(
+        self, rendition: str, version: tuple[int, str | None]
+    ) -> StoredImage | None:
+        """Rendition aus dem persistenten Cache laden oder neu kodieren."""
+        settings = self.coordinator.encode_settings
+        _generation, fingerprint = version
         try:
-            if self.coordinator.data is None:
-                return None
+            pictures_ref = self.coordinator.get_picture_ref(self._vin, self._picture_key)
 
-            vehicle_data = self.coordinator.data.get(self._vin)
-            if vehicle_data is None:
-                return None
+            # Persistenter Cache: sofort liefern, wenn noch keine Live-Daten
+            # vorliegen oder die Pixel seit dem Speichern unverändert sind
+            image_cache = self.coordinator.image_cache
+            cached_fingerprint = image_cache.get_fingerprint(
+                self._vin, self._picture_key, rendition, settings.variant
+            )
+            if cached_fingerprint is not None and (
+                pictures_ref is None or cached_fingerprint == fingerprint
+            ):
+                image_bytes = await image_cache.async_get_image(
+                    self._vin, self._picture_key, rendition
+                )
+                if image_bytes is not None:
+                    self.coordinator.stats["disk_cache_hit"] += 1
+                    return self.coordinator.put_image_if_current(
+                        self._vin,
+                        self._picture_key,
+                        rendition,
+                        (version[0], cached_fingerprint),
+                        image_bytes,
+                    )
 
-            picture_refs = vehicle_data.get("picture_refs", {})
-            pictures_ref = picture_refs.get(self._picture_key)
             if pictures_ref is None:
                 return None
 
-            # Bilder-Zugriff ist blocking → in Executor ausführen
+            # Rückfall: Bild fehlt im Store (verdrängt oder Batch fehlgeschlagen)
             def _get_image_bytes():
                 pil_image = pictures_ref.value
                 if pil_image is None:
                     return None
+                return encode_image(pil_image, settings, rendition)
 
-                # Größenprüfung gegen Decompression-Bombs
-                width, height = pil_image.size
-                if width * height > MAX_IMAGE_PIXELS:
-                    _LOGGER.warning(
-                        "Bild zu groß (%dx%d), überspringe",
-                        width, height,
-                    )
-                    return None
-
-                buf = io.BytesIO()
-                pil_image.save(buf, format="PNG")
-                image_bytes = buf.getvalue()
-                buf.close()
-                return image_bytes
-
-            self._cached_image_bytes = await self.hass.async_add_executor_job(
-                _get_image_bytes
+            self.coordinator.stats["encode_on_demand"] += 1
+            image_bytes = await self.coordinator.timings.async_executor_job(
+                self.hass,
+                f"encode_{self._picture_key}",
+                _get_image_bytes,
+                pool=self.coordinator.encode_pool,
+            )
+            if image_bytes is None:
+                return None
+            return self.coordinator.put_image_if_current(
+                self._vin, self._picture_key, rendition, version, image_bytes
             )
-            return self._cached_image_bytes
 
         except Exception:
             _LOGGER.debug(
@@ -157,7 +294,39 @@ class VehicleImageEntity(CoordinatorEntity[VWImagesCoordinator], ImageEntity):
             )
             return None
 
+    @property
+    def entity_picture(self) -> str:
+        """Bild über die eigene View (ETag, versioniert dauerhaft cachebar)."""
+        url = (
+            f"/api/{DOMAIN}/{self.entity_id}/{RENDITION_FULL}"
+            f"?token={self.access_tokens[-1]}"
+        )
+        stored = self.coordinator.image_store.peek(
+            self._vin, self._picture_key, RENDITION_FULL
+        )
+        return f"{url}&v={stored.version}" if stored else url
+
     @property
     def content_type(self) -> str:
-        """Bild-Format: PNG."""
-        return "image/png"
+        """Bild-Format laut Optionen (PNG, WebP oder JPEG)."""
+        return self.coordinator.encode_settings.content_type
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Renditionen mit URL, Größe und Encode-Zeit."""
+        renditions = {}
+        for rendition in self.coordinator.encode_settings.renditions:
+            stored = self.coordinator.image_store.peek(
+                self._vin, self._picture_key, rendition
+            )
+            url = f"/api/{DOMAIN}/{self.entity_id}/{rendition}"
+            renditions[rendition] = {
+                # Versionierte URL: darf vom Browser dauerhaft gecacht werden
+                "url": f"{url}?v={stored.version}" if stored else url,
+                "bytes": len(stored.data) if stored else None,
+                "encode_ms": round(stored.encode_time * 1000, 1) if stored else None,
+            }
+        return {
+            "format": self.coordinator.encode_settings.variant,
+            "renditions": renditions,
+        }
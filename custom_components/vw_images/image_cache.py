@@ -0,0 +1,302 @@
+"""Persistenter Bild-Cache für die VW Images Integration.
+
+Kodierte Bilder und Fahrzeug-Metadaten werden unter .storage abgelegt,
+damit nach einem Neustart sofort die zuletzt bekannten Bilder angezeigt
+werden können – noch bevor Login und erster Abruf abgeschlossen sind.
+"""
+
+import logging
+import os
+import re
+import shutil
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_STORAGE_VERSION, DOMAIN, MAX_DISK_CACHE_BYTES, RENDITION_FULL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Verzögerung beim Schreiben des Index (mehrere Bilder → ein Schreibvorgang)
+INDEX_SAVE_DELAY = 5
+
+# Zulässige Namen von Bildebenen (werden zu Dateinamen)
+_LAYER_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class VWImageCache:
+    """Versionierter On-Disk-Cache pro Config-Entry.
+
+    Index (Metadaten, Fingerprints) liegt als JSON-Store unter
+    .storage/vw_images.<entry_id>.cache, die Bild-Bytes als Einzeldateien
+    unter .storage/vw_images/<entry_id>/. Rohe Bildebenen der lokalen
+    Komposition liegen unter .storage/vw_images/<entry_id>/layers/<vin>/.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialisiere den Cache (noch ohne Laden)."""
+        self.hass = hass
+        self._directory = hass.config.path(".storage", DOMAIN, entry_id)
+        self._store: Store = Store(
+            hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.cache"
+        )
+        self._vehicles: dict[str, dict] = {}
+        self._images: dict[str, dict] = {}
+        self._layers: dict[str, dict] = {}
+
+    @staticmethod
+    def _image_key(vin: str, picture_key: str, rendition: str) -> str:
+        return f"{vin}/{picture_key}/{rendition}"
+
+    @property
+    def vehicles(self) -> dict[str, dict]:
+        """Zuletzt bekannte Fahrzeug-Metadaten (VIN, Modell, Name, Bildtypen)."""
+        return self._vehicles
+
+    @property
+    def total_bytes(self) -> int:
+        """Belegter Speicherplatz aller Bilddateien."""
+        return sum(meta["size"] for meta in self._images.values())
+
+    async def async_load(self) -> None:
+        """Index von der Festplatte laden."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        self._vehicles = data.get("vehicles", {})
+        self._images = data.get("images", {})
+        self._layers = data.get("layers", {})
+        _LOGGER.debug(
+            "Bild-Cache geladen: %d Fahrzeug(e), %d Bild(er)",
+            len(self._vehicles),
+            len(self._images),
+        )
+
+    def get_fingerprint(
+        self,
+        vin: str,
+        picture_key: str,
+        rendition: str = RENDITION_FULL,
+        variant: str | None = None,
+    ) -> str | None:
+        """Fingerprint des gecachten Bilds (oder None).
+
+        Mit variant zählen nur Einträge im gleichen Format/Qualität.
+        """
+        meta = self._images.get(self._image_key(vin, picture_key, rendition))
+        if meta is None or (variant is not None and meta.get("variant") != variant):
+            return None
+        return meta["fingerprint"]
+
+    async def async_get_image(
+        self, vin: str, picture_key: str, rendition: str = RENDITION_FULL
+    ) -> bytes | None:
+        """Gecachte Bild-Bytes lesen (blocking → Executor)."""
+        key = self._image_key(vin, picture_key, rendition)
+        meta = self._images.get(key)
+        if meta is None:
+            return None
+
+        path = os.path.join(self._directory, meta["file"])
+
+        def _read() -> bytes | None:
+            try:
+                with open(path, "rb") as file:
+                    return file.read()
+            except OSError:
+                return None
+
+        image_bytes = await self.hass.async_add_executor_job(_read)
+        if image_bytes is None:
+            # Datei fehlt oder ist unlesbar → Eintrag verwerfen
+            self._images.pop(key, None)
+            self._async_schedule_save()
+        return image_bytes
+
+    async def async_put_image(
+        self,
+        vin: str,
+        picture_key: str,
+        rendition: str,
+        fingerprint: str | None,
+        variant: str,
+        image_bytes: bytes,
+    ) -> None:
+        """Kodiertes Bild speichern und ggf. alte Einträge verdrängen."""
+        key = self._image_key(vin, picture_key, rendition)
+        meta = self._images.get(key)
+        if (
+            meta is not None
+            and fingerprint is not None
+            and meta["fingerprint"] == fingerprint
+            and meta.get("variant") == variant
+        ):
+            return
+
+        filename = f"{vin}_{picture_key}_{rendition}.img"
+        path = os.path.join(self._directory, filename)
+
+        def _write() -> None:
+            os.makedirs(self._directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(image_bytes)
+            os.replace(tmp_path, path)
+
+        try:
+            await self.hass.async_add_executor_job(_write)
+        except OSError:
+            _LOGGER.debug("Bild-Cache konnte nicht geschrieben werden", exc_info=True)
+            return
+
+        self._images[key] = {
+            "fingerprint": fingerprint,
+            "variant": variant,
+            "file": filename,
+            "size": len(image_bytes),
+            "stored_at": time.time(),
+        }
+        await self._async_enforce_size_limit()
+        self._async_schedule_save()
+
+    def _layer_directory(self, vin: str) -> str:
+        return os.path.join(self._directory, "layers", vin)
+
+    async def async_get_layers(self, vin: str) -> dict[str, bytes] | None:
+        """Gecachte Bildebenen eines Fahrzeugs lesen (None wenn fehlend)."""
+        meta = self._layers.get(vin)
+        if meta is None:
+            return None
+        directory = self._layer_directory(vin)
+
+        def _read() -> dict[str, bytes] | None:
+            layers = {}
+            try:
+                for name in meta["names"]:
+                    with open(os.path.join(directory, f"{name}.png"), "rb") as file:
+                        layers[name] = file.read()
+            except OSError:
+                return None
+            return layers
+
+        layers = await self.hass.async_add_executor_job(_read)
+        if layers is None:
+            # Unvollständig → beim nächsten Abruf neu laden
+            self._layers.pop(vin, None)
+            self._async_schedule_save()
+        return layers
+
+    async def async_put_layers(self, vin: str, layers: dict[str, bytes]) -> None:
+        """Bildebenen eines Fahrzeugs speichern (ersetzt den bisherigen Stand)."""
+        layers = {name: data for name, data in layers.items() if _LAYER_NAME.match(name)}
+        directory = self._layer_directory(vin)
+
+        def _write() -> None:
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory, exist_ok=True)
+            for name, data in layers.items():
+                with open(os.path.join(directory, f"{name}.png"), "wb") as file:
+                    file.write(data)
+
+        try:
+            await self.hass.async_add_executor_job(_write)
+        except OSError:
+            _LOGGER.debug("Bildebenen konnten nicht geschrieben werden", exc_info=True)
+            return
+        self._layers[vin] = {"fetched_at": time.time(), "names": sorted(layers)}
+        self._async_schedule_save()
+
+    async def async_update_vehicles(
+        self, vehicles: dict, selection: dict[str, tuple[str, ...]]
+    ) -> None:
+        """Fahrzeug-Metadaten übernehmen, verschwundene VINs und Bildtypen entfernen.
+
+        selection: VIN → gewählte Bildtypen. Eine leere Fahrzeugliste gilt
+        als Störung und lässt den Cache unverändert.
+        """
+        if not vehicles:
+            return
+        self._vehicles = {
+            vin: {
+                "vin": vin,
+                "model": vehicle_data.get("model"),
+                "nickname": vehicle_data.get("nickname"),
+                "picture_keys": vehicle_data.get("picture_keys", []),
+            }
+            for vin, vehicle_data in vehicles.items()
+        }
+        stale = []
+        for key in self._images:
+            vin, picture_key, _rendition = key.split("/", 2)
+            if picture_key not in selection.get(vin, ()):
+                stale.append(key)
+        if stale:
+            _LOGGER.debug("Entferne %d veraltete(s) Bild(er)", len(stale))
+            await self._async_remove_images(stale)
+        stale_layers = [vin for vin in self._layers if vin not in vehicles]
+        for vin in stale_layers:
+            del self._layers[vin]
+            await self.hass.async_add_executor_job(
+                shutil.rmtree, self._layer_directory(vin), True
+            )
+        self._async_schedule_save()
+
+    async def _async_enforce_size_limit(self) -> None:
+        """Älteste Bilder entfernen, bis das Größenlimit eingehalten wird."""
+        excess = self.total_bytes - MAX_DISK_CACHE_BYTES
+        if excess <= 0:
+            return
+        evict = []
+        for key, meta in sorted(
+            self._images.items(), key=lambda item: item[1]["stored_at"]
+        ):
+            if excess <= 0:
+                break
+            evict.append(key)
+            excess -= meta["size"]
+        _LOGGER.debug("Bild-Cache über Limit, verdränge %d Bild(er)", len(evict))
+        await self._async_remove_images(evict)
+
+    async def _async_remove_images(self, keys: list[str]) -> None:
+        """Einträge und zugehörige Dateien löschen."""
+        paths = []
+        for key in keys:
+            meta = self._images.pop(key, None)
+            if meta is not None:
+                paths.append(os.path.join(self._directory, meta["file"]))
+
+        def _remove() -> None:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        await self.hass.async_add_executor_job(_remove)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, INDEX_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {
+            "vehicles": self._vehicles,
+            "images": self._images,
+            "layers": self._layers,
+        }
+
+    async def async_flush(self) -> None:
+        """Index sofort schreiben statt verzögert (z. B. vor dem Entladen)."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Cache vollständig löschen (beim Entfernen des Config-Entries)."""
+        await self._store.async_remove()
+        await self.hass.async_add_executor_job(
+            shutil.rmtree, self._directory, True
+        )
+        self._vehicles = {}
+        self._images = {}
+        self._layers = {}
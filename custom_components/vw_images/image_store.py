@@ -0,0 +1,177 @@
+"""Gemeinsamer Speicher für kodierte Fahrzeugbilder.
+
+Ein Store für die gesamte Integration (alle Accounts) mit Speicherbudget
+je Account und LRU-Verdrängung. Verdrängte Bilder werden bei Bedarf aus dem
+persistenten Cache nachgeladen oder neu kodiert.
+"""
+
+import hashlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from .const import RENDITION_FULL
+
+
+@dataclass(slots=True)
+class StoredImage:
+    """Kodiertes Bild samt Fingerprint der Quellpixel."""
+
+    fingerprint: str | None
+    data: bytes
+    encode_time: float = 0.0
+    version: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Inhalts-Hash der kodierten Bytes (nicht der Quellpixel)
+        self.version = hashlib.blake2b(self.data, digest_size=16).hexdigest()
+
+    @property
+    def etag(self) -> str:
+        """Starker ETag für HTTP-Antworten."""
+        return f'"{self.version}"'
+
+
+class VWImageStore:
+    """Kodierte Bilder je (Entry, VIN, Bildtyp, Rendition) mit LRU-Budget.
+
+    Jeder Config-Entry hat sein eigenes Budget; verdrängt werden nur
+    Bilder des Entries, der sein Budget überschreitet.
+    """
+
+    def __init__(self) -> None:
+        """Initialisiere den leeren Speicher."""
+        self._images: OrderedDict[tuple[str, str, str, str], StoredImage] = (
+            OrderedDict()
+        )
+        self._budgets: dict[str, int] = {}
+        self._sizes: Counter[str] = Counter()
+        self._size = 0
+        self.stats: Counter[str] = Counter()
+
+    @property
+    def budget(self) -> int:
+        """Speicherbudget aller Entries in Byte."""
+        return sum(self._budgets.values())
+
+    @property
+    def size(self) -> int:
+        """Aktuell belegter Speicher in Byte."""
+        return self._size
+
+    @property
+    def state(self) -> dict:
+        """Größe, Budget und Zähler (Treffer, Verdrängungen)."""
+        return {
+            "entries": len(self._images),
+            "size_bytes": self._size,
+            "budget_bytes": self.budget,
+            **self.stats,
+        }
+
+    def namespace(self, entry_id: str) -> "VWImageStoreNamespace":
+        """Sicht auf die Bilder eines Config-Entries."""
+        return VWImageStoreNamespace(self, entry_id)
+
+    def set_budget(self, entry_id: str, budget: int) -> None:
+        """Budget-Anteil eines Config-Entries setzen."""
+        self._budgets[entry_id] = budget
+        self._evict(entry_id)
+
+    def remove_entry(self, entry_id: str) -> None:
+        """Alle Bilder und das Budget eines Config-Entries entfernen."""
+        self._budgets.pop(entry_id, None)
+        self.discard(lambda key: key[0] == entry_id)
+        self._sizes.pop(entry_id, None)
+
+    def get(self, key: tuple[str, str, str, str]) -> StoredImage | None:
+        """Gespeichertes Bild (oder None); Treffer zählen als Nutzung."""
+        stored = self._images.get(key)
+        if stored is None:
+            self.stats["misses"] += 1
+            return None
+        self._images.move_to_end(key)
+        self.stats["hits"] += 1
+        return stored
+
+    def peek(self, key: tuple[str, str, str, str]) -> StoredImage | None:
+        """Gespeichertes Bild ohne Einfluss auf die LRU-Reihenfolge."""
+        return self._images.get(key)
+
+    def put(self, key: tuple[str, str, str, str], stored: StoredImage) -> None:
+        """Kodiertes Bild ablegen bzw. ersetzen, danach Budget durchsetzen."""
+        old = self._images.pop(key, None)
+        if old is not None:
+            self._account(key, -len(old.data))
+        self._images[key] = stored
+        self._account(key, len(stored.data))
+        self._evict(key[0])
+
+    def discard(self, predicate) -> None:
+        """Alle Bilder entfernen, deren Schlüssel predicate erfüllt."""
+        for key in [key for key in self._images if predicate(key)]:
+            self._account(key, -len(self._images.pop(key).data))
+
+    def _account(self, key: tuple[str, str, str, str], delta: int) -> None:
+        self._size += delta
+        self._sizes[key[0]] += delta
+
+    def _evict(self, entry_id: str) -> None:
+        """Am längsten ungenutzte Bilder des Entries verdrängen, bis es passt."""
+        excess = self._sizes[entry_id] - self._budgets.get(entry_id, 0)
+        if excess <= 0:
+            return
+        evict = []
+        for key, stored in self._images.items():
+            if excess <= 0:
+                break
+            if key[0] == entry_id:
+                evict.append(key)
+                excess -= len(stored.data)
+        for key in evict:
+            self._account(key, -len(self._images.pop(key).data))
+            self.stats["evictions"] += 1
+
+
+class VWImageStoreNamespace:
+    """Bilder eines Config-Entries im gemeinsamen Store."""
+
+    def __init__(self, store: VWImageStore, entry_id: str) -> None:
+        """Initialisiere die Sicht."""
+        self._store = store
+        self._entry_id = entry_id
+
+    def get(
+        self, vin: str, picture_key: str, rendition: str = RENDITION_FULL
+    ) -> StoredImage | None:
+        """Gespeichertes Bild (oder None)."""
+        return self._store.get((self._entry_id, vin, picture_key, rendition))
+
+    def peek(
+        self, vin: str, picture_key: str, rendition: str = RENDITION_FULL
+    ) -> StoredImage | None:
+        """Gespeichertes Bild ohne LRU-Nutzung (für Vergleiche/Attribute)."""
+        return self._store.peek((self._entry_id, vin, picture_key, rendition))
+
+    def put(
+        self,
+        vin: str,
+        picture_key: str,
+        rendition: str,
+        fingerprint: str | None,
+        data: bytes,
+        encode_time: float = 0.0,
+    ) -> StoredImage:
+        """Kodiertes Bild ablegen bzw. ersetzen."""
+        stored = StoredImage(fingerprint, data, encode_time)
+        self._store.put((self._entry_id, vin, picture_key, rendition), stored)
+        return stored
+
+    def retain(self, selection: dict[str, tuple[str, ...]]) -> None:
+        """Bilder verschwundener Fahrzeuge und abgewählter Bildtypen verwerfen.
+
+        selection: VIN → gewählte Bildtypen.
+        """
+        entry_id = self._entry_id
+        self._store.discard(
+            lambda key: key[0] == entry_id and key[2] not in selection.get(key[1], ())
+        )
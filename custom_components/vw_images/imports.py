@@ -0,0 +1,71 @@
+"""Schwere Abhängigkeiten außerhalb des Event-Loops importieren.
+
+weconnect (samt requests und vieler Domain-Module) und PIL brauchen beim
+ersten Import spürbar Zeit. Im Event-Loop importiert, würden sie Home
+Assistant beim Start und beim Öffnen des Config-Flows blockieren. Sie
+werden daher einmalig im Executor geladen – vorgewärmt in async_setup,
+alle anderen Stellen warten auf denselben Import.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_IMPORTS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reihenfolge zählt: die Dauer je Modul enthält nur, was frühere Module
+# noch nicht geladen haben
+HEAVY_MODULES = (
+    "PIL.Image",
+    "PIL.PngImagePlugin",
+    "PIL.JpegImagePlugin",
+    "PIL.WebPImagePlugin",
+    "weconnect.errors",
+    "weconnect.domain",
+    "weconnect.weconnect",
+)
+
+
+def _import_modules() -> dict[str, float]:
+    """Module importieren, Dauer je Modul in Sekunden (blocking)."""
+    durations = {}
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Fehlt ein Modul, schlägt der spätere Import mit Meldung fehl
+            _LOGGER.debug("Modul %s nicht importierbar", name, exc_info=True)
+            continue
+        durations[name] = time.perf_counter() - start
+    return durations
+
+
+async def async_import_dependencies(hass: HomeAssistant) -> dict[str, float]:
+    """weconnect und PIL im Executor importieren (nur beim ersten Aufruf).
+
+    Gleichzeitige Aufrufe warten auf denselben Import. Liefert die
+    Importdauer je Modul in Sekunden.
+    """
+    future: asyncio.Future | None = hass.data.get(DATA_IMPORTS)
+    if future is None:
+        # Eigener Import-Executor ab HA 2024.3, davor der normale Executor
+        add_job = getattr(
+            hass, "async_add_import_executor_job", hass.async_add_executor_job
+        )
+        future = hass.data[DATA_IMPORTS] = add_job(_import_modules)
+    # Abbruch eines Wartenden bricht den Import für die anderen nicht ab
+    return await asyncio.shield(future)
+
+
+def import_durations(hass: HomeAssistant) -> dict[str, float] | None:
+    """Importdauer je Modul (None, solange der Import läuft)."""
+    future: asyncio.Future | None = hass.data.get(DATA_IMPORTS)
+    if future is None or not future.done():
+        return None
+    return future.result()
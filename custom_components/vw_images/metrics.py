@@ -0,0 +1,132 @@
+"""Laufzeit-Metriken für die VW Images Integration.
+
+Zeitmessungen je Phase (Login, Abruf, Bild-Extraktion, Encoding) samt
+Wartezeit im Executor bzw. in den Worker-Pools. Damit lässt sich unterscheiden, ob langsame
+Bilder an der VW-Cloud, am ausgelasteten Executor oder am Kodieren liegen.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant
+
+from .workers import WorkerPool
+
+# Name der Wartezeit zwischen Einreihen und Start eines Executor-Jobs
+# (je Worker-Pool zusätzlich als "executor_wait_<pool>")
+EXECUTOR_WAIT = "executor_wait"
+
+
+@dataclass(slots=True)
+class TimingStat:
+    """Laufende Statistik einer Phase (Sekunden)."""
+
+    count: int = 0
+    total: float = 0.0
+    last: float | None = None
+    max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Messwert übernehmen."""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def average(self) -> float | None:
+        """Mittelwert aller Messungen."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        """Werte in Millisekunden (für Diagnose und Attribute)."""
+        return {
+            "count": self.count,
+            "last_ms": _ms(self.last),
+            "avg_ms": _ms(self.average),
+            "max_ms": _ms(self.max if self.count else None),
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def hit_rate(hits: int, misses: int) -> float | None:
+    """Trefferquote in Prozent (None ohne Anfragen)."""
+    total = hits + misses
+    return round(hits / total * 100, 1) if total else None
+
+
+class TimingStats:
+    """Zeitmessungen je Phase eines Accounts."""
+
+    def __init__(self) -> None:
+        """Initialisiere leere Statistiken."""
+        self._stats: dict[str, TimingStat] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Messwert für eine Phase übernehmen."""
+        self._stats.setdefault(name, TimingStat()).add(seconds)
+
+    def get(self, name: str) -> TimingStat | None:
+        """Statistik einer Phase (oder None, falls nie gemessen)."""
+        return self._stats.get(name)
+
+    def matching(self, prefix: str) -> dict[str, TimingStat]:
+        """Alle Phasen mit gemeinsamem Präfix (z. B. "encode_")."""
+        return {
+            name[len(prefix) :]: stat
+            for name, stat in self._stats.items()
+            if name.startswith(prefix)
+        }
+
+    @contextmanager
+    def measure(self, name: str):
+        """Dauer eines Blocks messen (auch über await hinweg)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    async def async_executor_job(
+        self,
+        hass: HomeAssistant,
+        name: str | None,
+        target,
+        *args,
+        pool: WorkerPool | None = None,
+    ):
+        """Job im Executor (oder Worker-Pool) ausführen.
+
+        Warte- und Laufzeit werden getrennt gemessen; ohne name nur die
+        Wartezeit (wenn der Job seine Laufzeit selbst meldet).
+        """
+        submitted = time.perf_counter()
+        started = finished = None
+
+        def _run():
+            nonlocal started, finished
+            started = time.perf_counter()
+            try:
+                return target(*args)
+            finally:
+                finished = time.perf_counter()
+
+        try:
+            if pool is not None:
+                return await pool.async_run(_run)
+            return await hass.async_add_executor_job(_run)
+        finally:
+            if started is not None:
+                self.record(EXECUTOR_WAIT, started - submitted)
+                if pool is not None:
+                    self.record(f"{EXECUTOR_WAIT}_{pool.name}", started - submitted)
+                if name is not None:
+                    self.record(name, finished - started)
+
+    def as_dict(self) -> dict:
+        """Alle Phasen in Millisekunden."""
+        return {name: stat.as_dict() for name, stat in sorted(self._stats.items())}
@@ -0,0 +1,217 @@
+"""Wiederholungen und Circuit Breaker für WeConnect-Aufrufe.
+
+Netzwerkfehler werden mit exponentiellem Backoff (mit Jitter) einige
+Male wiederholt. Scheitern mehrere Abrufe hintereinander, sperrt der
+Circuit Breaker weitere Aufrufe für eine Abkühlphase – in der Zeit
+liefern die Entitäten die zuletzt bekannten Bilder aus dem Cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_MAX_COOLDOWN,
+    BREAKER_THRESHOLD,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Zustände des Circuit Breakers
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Fehlerklassen (siehe ResilientCaller.async_call)
+ERROR_RETRY = "retry"
+ERROR_FAIL = "fail"
+ERROR_IGNORE = "ignore"
+
+
+class CircuitOpenError(Exception):
+    """Aufruf abgelehnt, weil der Circuit Breaker offen ist."""
+
+    def __init__(self, remaining: float) -> None:
+        """Initialisiere den Fehler mit der Restdauer der Sperre."""
+        super().__init__(f"WeConnect-Aufrufe für {remaining:.0f} s gesperrt")
+        self.remaining = remaining
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Anzahl Versuche und Backoff-Grenzen (Sekunden)."""
+
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def delay(self, retry: int) -> float:
+        """Wartezeit vor Wiederholung Nr. retry ("Full Jitter")."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+
+class CircuitBreaker:
+    """Sperrt Aufrufe nach wiederholten Fehlschlägen für eine Abkühlphase.
+
+    Nach Ablauf der Sperre ist genau ein Probeaufruf erlaubt (half open).
+    Scheitert er, verdoppelt sich die Sperrdauer bis BREAKER_MAX_COOLDOWN.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        max_cooldown: float = BREAKER_MAX_COOLDOWN,
+    ) -> None:
+        """Initialisiere den (geschlossenen) Breaker."""
+        self._threshold = threshold
+        self._base_cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self.last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        """closed, open oder half_open."""
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if self.remaining > 0:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    @property
+    def remaining(self) -> float:
+        """Restdauer der Sperre in Sekunden (0 = Aufrufe erlaubt)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Ob ein Aufruf jetzt erlaubt ist (reserviert ggf. den Probeaufruf)."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Erfolgreicher Aufruf: Breaker schließen."""
+        if self._opened_at is not None:
+            _LOGGER.info("WeConnect wieder erreichbar, Circuit Breaker geschlossen")
+        self._failures = 0
+        self._opened_at = None
+        self._cooldown = self._base_cooldown
+        self._trial_running = False
+
+    def cancel_trial(self) -> None:
+        """Abgebrochenen Probeaufruf freigeben (weder Erfolg noch Fehler)."""
+        self._trial_running = False
+
+    def record_failure(self, err: BaseException) -> bool:
+        """Fehlschlag zählen; gibt zurück, ob der Breaker dadurch öffnet."""
+        self.last_error = type(err).__name__
+        self._failures += 1
+        if self._trial_running:
+            # Probeaufruf gescheitert → längere Sperre
+            self._trial_running = False
+            self._cooldown = min(self._cooldown * 2, self._max_cooldown)
+        elif self._failures < self._threshold:
+            return False
+        self._opened_at = time.monotonic()
+        _LOGGER.warning(
+            "WeConnect %d× in Folge fehlgeschlagen, Aufrufe für %d s gesperrt",
+            self._failures,
+            self._cooldown,
+        )
+        return True
+
+    def as_dict(self) -> dict:
+        """Zustand für Diagnose und Attribute."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "open_for": round(self.remaining, 1),
+            "cooldown": self._cooldown,
+            "last_error": self.last_error,
+        }
+
+
+class ResilientCaller:
+    """Führt WeConnect-Aufrufe mit Wiederholungen hinter dem Breaker aus."""
+
+    def __init__(
+        self,
+        classify: Callable[[Exception], str],
+        stats: Counter[str],
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """Initialisiere mit Fehlerklassifizierung und Zählern.
+
+        classify ordnet einen Fehler ERROR_RETRY (vorübergehend, wird
+        wiederholt), ERROR_FAIL (zählt für den Breaker) oder ERROR_IGNORE
+        (z. B. Anmeldefehler – kein Ausfall des Backends, Breaker-Zustand
+        bleibt unverändert) zu.
+        """
+        self._classify = classify
+        self._stats = stats
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    async def async_call(self, name: str, job: Callable[[], Awaitable[_T]]) -> _T:
+        """job ausführen; löst CircuitOpenError aus, solange gesperrt."""
+        if not self.breaker.allow():
+            self._stats["breaker_rejected"] += 1
+            raise CircuitOpenError(self.breaker.remaining)
+
+        retry = 0
+        while True:
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                self.breaker.cancel_trial()
+                raise
+            except Exception as err:
+                kind = self._classify(err)
+                if kind == ERROR_IGNORE:
+                    # Weder Erfolg noch Fehler: Zähler bleibt, ein
+                    # reservierter Probeaufruf wird nur freigegeben
+                    self.breaker.cancel_trial()
+                    raise
+                if kind == ERROR_RETRY and retry + 1 < self.policy.attempts:
+                    retry += 1
+                    delay = self.policy.delay(retry)
+                    self._stats["retries"] += 1
+                    self._stats[f"retries_{name}"] += 1
+                    _LOGGER.debug(
+                        "WeConnect %s fehlgeschlagen (%s), Versuch %d in %.1f s",
+                        name,
+                        type(err).__name__,
+                        retry + 1,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                if self.breaker.record_failure(err):
+                    self._stats["breaker_opened"] += 1
+                raise
+            self.breaker.record_success()
+            return result
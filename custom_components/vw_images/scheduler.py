@@ -0,0 +1,204 @@
+"""Refresh-Scheduler für die VW Images Integration.
+
+Bündelt Refresh-Anfragen (Buttons, Service-Calls) pro Account:
+gleichzeitige Anfragen teilen sich einen laufenden Abruf, Anfragen im
+Rate-Limit-Fenster werden gesammelt und genau einmal nachgeholt, sobald
+das Fenster wieder offen ist.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+if TYPE_CHECKING:
+    from .coordinator import VWImagesCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Ergebnis einer Refresh-Anfrage
+REFRESH_DONE = "refreshed"
+REFRESH_FAILED = "failed"
+REFRESH_DEFERRED = "deferred"
+
+
+class RefreshScheduler:
+    """Koaleszierender Refresh-Scheduler pro Account.
+
+    Ziel None steht für einen vollständigen Refresh, ansonsten für eine VIN.
+    Ein vollständiger Refresh deckt alle wartenden VIN-Anfragen mit ab.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: VWImagesCoordinator) -> None:
+        """Initialisiere den Scheduler."""
+        self.hass = hass
+        self._coordinator = coordinator
+        # Wartende Anfragen: Ziel → Futures der Aufrufer
+        self._pending: dict[str | None, list[asyncio.Future]] = {}
+        # Ziele des laufenden Abrufs
+        self._in_flight: dict[str | None, list[asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._next_run: float | None = None
+        self.stats: Counter[str] = Counter()
+
+    @property
+    def state(self) -> dict:
+        """Zustand von Warteschlange und Rate-Limit-Fenster."""
+        now = self.hass.loop.time()
+        return {
+            "in_flight": self._in_flight is not None,
+            "in_flight_full": self._in_flight is not None and None in self._in_flight,
+            "in_flight_vehicles": sum(
+                1 for target in self._in_flight or {} if target is not None
+            ),
+            "pending_full": None in self._pending,
+            "pending_vehicles": sum(1 for target in self._pending if target is not None),
+            "next_run_in": (
+                max(0.0, round(self._next_run - now, 1))
+                if self._next_run is not None
+                else None
+            ),
+            "window_open_in": round(self._coordinator.seconds_until_allowed(), 1),
+            **self.stats,
+        }
+
+    async def async_request(self, vin: str | None = None) -> str:
+        """Refresh anfordern (vollständig oder für eine VIN).
+
+        Läuft der Abruf sofort oder schließt sich einem laufenden an, wird
+        auf dessen Ende gewartet – ebenso, wenn die Anfrage nur hinter einem
+        laufenden Abruf wartet, der sie nicht abdeckt. Liegt sie im
+        Rate-Limit-Fenster, wird sie für den nachlaufenden Refresh
+        vorgemerkt und sofort mit REFRESH_DEFERRED beantwortet.
+        """
+        self.stats["requests"] += 1
+        future = self.hass.loop.create_future()
+
+        # An laufenden Abruf anhängen, wenn er das Ziel bereits abdeckt
+        if self._in_flight is not None:
+            if None in self._in_flight or vin in self._in_flight:
+                self.stats["coalesced"] += 1
+                self._in_flight[vin if vin in self._in_flight else None].append(future)
+                return await future
+
+        # Wartender vollständiger Refresh deckt jede VIN mit ab
+        target = None if None in self._pending else vin
+        if target in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending.setdefault(target, []).append(future)
+
+        self._async_process()
+
+        if self._in_flight is not None and any(
+            future in waiters for waiters in self._in_flight.values()
+        ):
+            return await future
+
+        if (
+            self._task is not None
+            and self._coordinator.seconds_until_allowed(target) <= 0
+        ):
+            # Kein Rate-Limit, nur hinter dem laufenden Abruf eingereiht:
+            # der nachlaufende Abruf startet direkt nach dessen Ende
+            self.stats["queued"] += 1
+            return await future
+
+        self.stats["deferred"] += 1
+        _LOGGER.debug(
+            "Rate-Limit: Refresh vorgemerkt, Ausführung in %d Sekunden",
+            int(self.state["next_run_in"] or 0),
+        )
+        return REFRESH_DEFERRED
+
+    @callback
+    def _async_process(self) -> None:
+        """Ausführbare Anfragen starten und Timer für den Rest planen."""
+        if self._task is not None or not self._pending:
+            self._async_schedule_timer()
+            return
+
+        targets: dict[str | None, list[asyncio.Future]] = {}
+        if None in self._pending:
+            if self._coordinator.seconds_until_allowed() <= 0:
+                targets, self._pending = self._pending, {}
+        else:
+            for vin in list(self._pending):
+                if self._coordinator.seconds_until_allowed(vin) <= 0:
+                    targets[vin] = self._pending.pop(vin)
+
+        if targets:
+            self._in_flight = targets
+            self._task = self.hass.async_create_background_task(
+                self._async_run(targets),
+                name=f"vw_images refresh {self._coordinator.config_entry.entry_id}",
+            )
+        self._async_schedule_timer()
+
+    async def _async_run(self, targets: dict[str | None, list[asyncio.Future]]) -> None:
+        """Einen gebündelten Abruf ausführen und alle Wartenden informieren."""
+        results: dict[str | None, bool] = {}
+        try:
+            if None in targets:
+                await self._coordinator.async_refresh()
+                results[None] = self._coordinator.last_update_success
+            else:
+                for vin in targets:
+                    results[vin] = await self._coordinator.async_refresh_vehicle(vin)
+        finally:
+            self.stats["runs"] += 1
+            for target, waiters in targets.items():
+                # Bei vollständigem Refresh gilt dessen Ergebnis für alle Ziele
+                success = results.get(target, results.get(None))
+                result = REFRESH_DONE if success else REFRESH_FAILED
+                for future in waiters:
+                    if not future.done():
+                        future.set_result(result)
+            self._task = None
+            self._in_flight = None
+            self._async_process()
+
+    @callback
+    def _async_schedule_timer(self) -> None:
+        """Nachlaufenden Refresh planen, sobald das Fenster öffnet."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._next_run = None
+
+        if self._task is not None or not self._pending:
+            return
+
+        if None in self._pending:
+            delay = self._coordinator.seconds_until_allowed()
+        else:
+            delay = min(
+                self._coordinator.seconds_until_allowed(vin) for vin in self._pending
+            )
+        delay = max(delay, 0)
+        self._next_run = self.hass.loop.time() + delay
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_timer_fired)
+
+    @callback
+    def _async_timer_fired(self, _now) -> None:
+        self._unsub_timer = None
+        self._async_process()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Timer und laufenden Abruf beenden, Wartende freigeben."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._task is not None:
+            self._task.cancel()
+        for waiters in self._pending.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_result(REFRESH_FAILED)
+        self._pending = {}
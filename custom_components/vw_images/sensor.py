@@ -0,0 +1,228 @@
+"""Diagnose-Sensoren für die VW Images Integration.
+
+Pro Account ein Satz Sensoren mit Laufzeiten und Cache-Kennzahlen.
+Standardmäßig deaktiviert, bei Bedarf in der Entitätsliste aktivieren.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import VWImagesCoordinator
+from .metrics import EXECUTOR_WAIT, TimingStat, hit_rate
+from .resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+
+
+@dataclass(frozen=True, kw_only=True)
+class VWDiagnosticSensorDescription(SensorEntityDescription):
+    """Beschreibung eines Diagnose-Sensors."""
+
+    value_fn: Callable[[VWImagesCoordinator], float | int | str | None]
+    attributes_fn: Callable[[VWImagesCoordinator], dict] | None = None
+
+
+def _last_ms(stat: TimingStat | None) -> float | None:
+    if stat is None or stat.last is None:
+        return None
+    return round(stat.last * 1000, 1)
+
+
+def _timing_sensor(key: str, name: str, timing: str) -> VWDiagnosticSensorDescription:
+    """Sensor mit der letzten Dauer einer Phase, Statistik als Attribute."""
+    return VWDiagnosticSensorDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _last_ms(coordinator.timings.get(timing)),
+        attributes_fn=lambda coordinator: (
+            stat.as_dict() if (stat := coordinator.timings.get(timing)) else {}
+        ),
+    )
+
+
+def _encode_average_ms(coordinator: VWImagesCoordinator) -> float | None:
+    """Mittlere Kodierzeit je Bild über alle Bildtypen."""
+    stats = coordinator.timings.matching("encode_")
+    stats.pop("batch", None)
+    count = sum(stat.count for stat in stats.values())
+    if not count:
+        return None
+    return round(sum(stat.total for stat in stats.values()) / count * 1000, 1)
+
+
+def _encode_attributes(coordinator: VWImagesCoordinator) -> dict:
+    """Kodierzeiten je Bildtyp."""
+    return {
+        picture_key: stat.as_dict()
+        for picture_key, stat in coordinator.timings.matching("encode_").items()
+    }
+
+
+SENSOR_DESCRIPTIONS: tuple[VWDiagnosticSensorDescription, ...] = (
+    _timing_sensor("login_time", "Login duration", "login"),
+    _timing_sensor("update_time", "WeConnect update duration", "update"),
+    _timing_sensor("extract_time", "Picture extraction duration", "extract"),
+    _timing_sensor("executor_wait", "Executor wait time", EXECUTOR_WAIT),
+    VWDiagnosticSensorDescription(
+        key="encode_time",
+        name="Encode duration per image",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_encode_average_ms,
+        attributes_fn=_encode_attributes,
+    ),
+    VWDiagnosticSensorDescription(
+        key="worker_queue",
+        name="Worker queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            coordinator.network_pool.queued + coordinator.encode_pool.queued
+        ),
+        attributes_fn=lambda coordinator: {
+            pool.name: {
+                **pool.state,
+                "wait": stat.as_dict()
+                if (stat := coordinator.timings.get(f"{EXECUTOR_WAIT}_{pool.name}"))
+                else None,
+            }
+            for pool in (coordinator.network_pool, coordinator.encode_pool)
+        },
+    ),
+    VWDiagnosticSensorDescription(
+        key="cache_hit_rate",
+        name="Image cache hit rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: hit_rate(
+            coordinator.stats["store_hit"],
+            coordinator.stats["disk_cache_hit"] + coordinator.stats["encode_on_demand"],
+        ),
+        attributes_fn=lambda coordinator: {
+            key: coordinator.stats[key]
+            for key in ("store_hit", "disk_cache_hit", "encode_on_demand")
+        },
+    ),
+    VWDiagnosticSensorDescription(
+        key="rate_limited_refreshes",
+        name="Rate-limited refreshes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.scheduler.stats["deferred"],
+    ),
+    VWDiagnosticSensorDescription(
+        key="api_budget_used",
+        name="API calls today",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.auto_refresh.budget.used,
+        attributes_fn=lambda coordinator: coordinator.auto_refresh.state,
+    ),
+    VWDiagnosticSensorDescription(
+        key="session_resets",
+        name="Session resets",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.stats["session_resets"],
+        attributes_fn=lambda coordinator: {
+            key: coordinator.stats[key]
+            for key in ("session_reset_auth", "session_reset_error", "transient_errors")
+        },
+    ),
+    VWDiagnosticSensorDescription(
+        key="circuit_breaker",
+        name="WeConnect circuit breaker",
+        device_class=SensorDeviceClass.ENUM,
+        options=[STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN],
+        value_fn=lambda coordinator: coordinator.resilience.breaker.state,
+        attributes_fn=lambda coordinator: coordinator.resilience.breaker.as_dict(),
+    ),
+    VWDiagnosticSensorDescription(
+        key="retries",
+        name="WeConnect retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.stats["retries"],
+        attributes_fn=lambda coordinator: {
+            key: coordinator.stats[key]
+            for key in (
+                "retries_login",
+                "retries_update",
+                "retries_vehicle_update",
+                "breaker_opened",
+                "breaker_rejected",
+            )
+        },
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Diagnose-Sensoren aus Config-Entry einrichten."""
+    coordinator: VWImagesCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        VWDiagnosticSensor(coordinator, description)
+        for description in SENSOR_DESCRIPTIONS
+    )
+
+
+class VWDiagnosticSensor(CoordinatorEntity[VWImagesCoordinator], SensorEntity):
+    """Laufzeit- oder Cache-Kennzahl eines Accounts."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    entity_description: VWDiagnosticSensorDescription
+
+    def __init__(
+        self,
+        coordinator: VWImagesCoordinator,
+        description: VWDiagnosticSensorDescription,
+    ) -> None:
+        """Initialisiere den Sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        entry = coordinator.config_entry
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{description.key}"
+
+        # Device-Info: ein Dienst-Gerät je Account (nicht je Fahrzeug)
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": f"VW Images ({entry.title})",
+            "manufacturer": "Volkswagen",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Metriken sind lokal und daher immer verfügbar."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | str | None:
+        """Aktueller Messwert."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Zusätzliche Statistik (Anzahl, Mittelwert, Maximum)."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator)
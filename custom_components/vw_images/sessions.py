@@ -0,0 +1,59 @@
+"""Übergabe angemeldeter WeConnect-Sessions vom Config-Flow an den Coordinator.
+
+Der Config-Flow meldet sich zur Prüfung der Zugangsdaten bei WeConnect an.
+Statt diese Session zu verwerfen, wird sie kurz in hass.data abgelegt und
+beim anschließenden Setup bzw. Reload vom Coordinator übernommen – Einrichtung
+und Reauth kommen so mit einem Login aus.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_PENDING_SESSIONS, PENDING_SESSION_TTL
+
+
+@dataclass(slots=True)
+class PendingSession:
+    """Angemeldete Session samt Passwort, mit dem sie erstellt wurde."""
+
+    weconnect: object
+    password: str
+    created: float = field(default_factory=time.monotonic)
+
+    @property
+    def expired(self) -> bool:
+        """Ob die Session nicht mehr übernommen werden soll."""
+        return time.monotonic() - self.created > PENDING_SESSION_TTL
+
+
+def _pending_sessions(hass: HomeAssistant) -> dict[str, PendingSession]:
+    """Abgelegte Sessions je Username, abgelaufene werden verworfen."""
+    sessions: dict[str, PendingSession] = hass.data.setdefault(
+        DATA_PENDING_SESSIONS, {}
+    )
+    for username in [name for name, pending in sessions.items() if pending.expired]:
+        del sessions[username]
+    return sessions
+
+
+@callback
+def async_store_pending_session(
+    hass: HomeAssistant, username: str, password: str, weconnect
+) -> None:
+    """Session aus dem Config-Flow für den Coordinator ablegen."""
+    _pending_sessions(hass)[username] = PendingSession(weconnect, password)
+
+
+@callback
+def async_pop_pending_session(hass: HomeAssistant, username: str, password: str):
+    """Abgelegte Session übernehmen (None, falls keine oder abgelaufen).
+
+    Passt das Passwort nicht (Zugangsdaten inzwischen geändert), wird die
+    Session verworfen.
+    """
+    pending = _pending_sessions(hass).pop(username, None)
+    if pending is None or pending.password != password:
+        return None
+    return pending.weconnect
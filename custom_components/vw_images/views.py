@@ -0,0 +1,76 @@
+"""HTTP-View für Bild-Renditionen der VW Images Integration."""
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+from homeassistant.components.image import DOMAIN as IMAGE_DOMAIN
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, RENDITION_SIZES
+from .image import VehicleImageEntity
+
+# Versionierte URLs (?v=<hash>) ändern sich mit dem Inhalt → dauerhaft cachebar
+CACHE_CONTROL_IMMUTABLE = "private, max-age=31536000, immutable"
+# Unversionierte URLs: bei jedem Aufruf per ETag revalidieren
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+
+
+class VWImageView(HomeAssistantView):
+    """Liefert eine Rendition (full, medium, thumbnail) eines Fahrzeugbilds.
+
+    Authentifizierung wie beim Image-Proxy von Home Assistant: entweder
+    angemeldeter Request oder gültiger Access-Token der Entität (?token=).
+    Jede Antwort trägt einen starken ETag; bedingte Anfragen mit passendem
+    If-None-Match werden mit 304 Not Modified ohne Body beantwortet.
+    """
+
+    url = f"/api/{DOMAIN}/{{entity_id}}/{{rendition}}"
+    name = f"api:{DOMAIN}:image"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialisiere die View."""
+        self.hass = hass
+
+    async def get(
+        self, request: web.Request, entity_id: str, rendition: str
+    ) -> web.StreamResponse:
+        """Rendition ausliefern."""
+        component = self.hass.data.get(IMAGE_DOMAIN)
+        entity = component.get_entity(entity_id) if component is not None else None
+        if not isinstance(entity, VehicleImageEntity) or rendition not in RENDITION_SIZES:
+            raise web.HTTPNotFound
+
+        authenticated = (
+            request[KEY_AUTHENTICATED]
+            or request.query.get("token") in entity.access_tokens
+        )
+        if not authenticated:
+            if hdrs.AUTHORIZATION in request.headers:
+                raise web.HTTPUnauthorized
+            raise web.HTTPForbidden
+
+        stored = await entity.async_rendition(rendition)
+        if stored is None:
+            raise web.HTTPNotFound
+
+        headers = {
+            hdrs.ETAG: stored.etag,
+            hdrs.CACHE_CONTROL: (
+                CACHE_CONTROL_IMMUTABLE
+                if request.query.get("v") == stored.version
+                else CACHE_CONTROL_REVALIDATE
+            ),
+        }
+
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        if if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or stored.etag in (tag.strip() for tag in if_none_match.split(","))
+        ):
+            entity.coordinator.stats["http_not_modified"] += 1
+            return web.Response(status=304, headers=headers)
+
+        entity.coordinator.stats["http_full_response"] += 1
+        return web.Response(
+            body=stored.data, content_type=entity.content_type, headers=headers
+        )
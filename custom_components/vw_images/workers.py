@@ -0,0 +1,110 @@
+"""Eigene Worker-Pools für blockierende Arbeit der VW Images Integration.
+
+WeConnect-Aufrufe (Netzwerk) und das Kodieren der Bilder (CPU) laufen in
+begrenzten Thread-Pools je Account statt im gemeinsamen Executor von
+Home Assistant. Ein langsamer VW-Server oder ein Stapel großer PNGs
+blockiert so höchstens die eigenen Threads, nie die anderer Integrationen.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+# Namen der Pools (auch Präfix der Thread-Namen und Metriken)
+POOL_NETWORK = "network"
+POOL_ENCODE = "encode"
+
+
+class WorkerPool:
+    """Begrenzter Thread-Pool mit Warteschlangen-Metriken.
+
+    Threads werden erst beim ersten Job gestartet.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        """Initialisiere den Pool (ohne Threads)."""
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self.stats: Counter[str] = Counter()
+
+    @property
+    def queued(self) -> int:
+        """Jobs, die auf einen freien Thread warten."""
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        """Gerade laufende Jobs."""
+        return self._running
+
+    @property
+    def state(self) -> dict:
+        """Zustand für Diagnose und Attribute."""
+        return {
+            "max_workers": self.max_workers,
+            "queued": self._queued,
+            "running": self._running,
+            "max_queued": self._max_queued,
+            "submitted": self.stats["submitted"],
+            "completed": self.stats["completed"],
+            "failed": self.stats["failed"],
+        }
+
+    async def async_run(self, target: Callable[..., Any], *args: Any) -> Any:
+        """target(*args) in einem Thread des Pools ausführen."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"vw_images_{self.name}",
+            )
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+            self.stats["submitted"] += 1
+
+        # Wer den Job zuerst aus der Warteschlange nimmt (Thread oder Abbruch)
+        dequeued = False
+
+        def _dequeue() -> None:
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self._queued -= 1
+
+        def _run() -> Any:
+            with self._lock:
+                _dequeue()
+                self._running += 1
+            try:
+                return target(*args)
+            except Exception:
+                with self._lock:
+                    self.stats["failed"] += 1
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.stats["completed"] += 1
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, _run)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Noch nicht gestarteter Job verlässt die Warteschlange
+            with self._lock:
+                _dequeue()
+            raise
+
+    def shutdown(self) -> None:
+        """Threads beenden, wartende Jobs verwerfen (nicht blockierend)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None